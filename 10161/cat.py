@@ -1,7 +1,12 @@
-import random
-import pygame
 import math
-from init import RED, GRID_SIZE
+import threading
+import numpy as np
+from config import RED, GRID_SIZE
+from init import map_dir
+from mapimage import write_bitmap_png
+from common.profiler import profiler
+from perception import current_perception
+from common.events import log
 from look import CatLook
 from catbush import CatBush
 from walkchase import CatWalkChase
@@ -13,6 +18,7 @@ class Cat:
         self.y = y
         self.world = world
         self.chem_manager = chem_manager
+        self.chem_a = chem_manager.get_pool('ChemA')  # Stress pool handle
         self.look = CatLook(self)
         self.bush = None  # Will be set in main.py
         self.policies = None  # Will be set in main.py
@@ -20,17 +26,16 @@ class Cat:
         self.bush_interaction_radius = 2
         self.bush_done = {}  # We'll populate this dynamically
         self.bush_counter = 0
+        self.bushes_completed = 0  # Never reset, used for run metrics
         self.color = (255, 0, 0)  # Red color for the cat
         self.collision_handler = CollisionHandler(world)
+        self.perception = None  # Latest pass; see perception.current_perception
 
     def initialize_bush_done(self):
-        for y in range(self.world.grid_height):
-            for x in range(self.world.grid_size):
-                cell = self.world.grid[y][x]
-                if isinstance(cell, tuple) and cell[0] == 'bush':
-                    bush_name = cell[1]
-                    if bush_name not in self.bush_done:
-                        self.bush_done[bush_name] = 0
+        for x, y in self.world.cells_of('bush'):
+            bush_name = self.world.cell(x, y)[1]
+            if bush_name not in self.bush_done:
+                self.bush_done[bush_name] = 0
 
     def update(self):
         self.look.update()
@@ -41,14 +46,14 @@ class Cat:
                     self.world.remove_rat(target_x, target_y)
                 self.chasing = None
                 self.look.stress_vision = False
-                print("Cat caught the target, stress vision deactivated")
+                log.info('target_caught', tick=self.world.tick, x=self.x, y=self.y, target=target_type)
             else:
                 new_x, new_y = self.policies.chase_target()
                 apply_collision_rules(self, new_x, new_y, self.collision_handler)
         else:
             new_x, new_y = self.policies.random_walk()
             apply_collision_rules(self, new_x, new_y, self.collision_handler)
-        self.bush.check_bush_interaction()
+        self.bush.check_bush_interaction(current_perception(self))  # From where the cat ended up
 
     def check_for_food_or_rat(self):
         return self.look.check_for_food_or_rat()
@@ -66,57 +71,57 @@ class Cat:
         self.bush.reset_bush_interactions()
 
     def draw(self, screen, CELL_SIZE):
-        pygame.draw.rect(screen, self.color, (self.x*CELL_SIZE, self.y*CELL_SIZE, CELL_SIZE, CELL_SIZE))
+        import pygame
+        return pygame.draw.rect(screen, self.color, (self.x*CELL_SIZE, self.y*CELL_SIZE, CELL_SIZE, CELL_SIZE))
 
     def draw_vision(self, screen, CELL_SIZE):
-        self.look.draw_vision(screen, CELL_SIZE)
+        return self.look.draw_vision(screen, CELL_SIZE)
+
+BIT_COUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
 
 class CatMapper:
+    # Explored cells as packed bits, one row of grid_size bits per grid row.
+    # Each tick's vision slice is packed and OR-ed in; the bits that were
+    # new are counted on the way, so coverage is a division.
     def __init__(self, grid_size, grid_height):
         self.grid_size = grid_size
         self.grid_height = grid_height
-        self.map = [[0 for _ in range(grid_size)] for _ in range(grid_height)]
+        self.packed = np.zeros((grid_height, (grid_size + 7) // 8), dtype=np.uint8)
+        self.explored = 0
+        self.rows = np.zeros((grid_height, grid_size), dtype=bool)  # Scratch for packing a slice
+
+    @property
+    def map(self):
+        # 0/1 per cell, unpacked (a copy)
+        return np.unpackbits(self.packed, axis=1, count=self.grid_size)
+
+    def coverage(self):
+        return self.explored / (self.grid_size * self.grid_height)
 
     def update(self, cat, world):
-        vision_range = cat.look.get_vision_range()
-        for y, x in vision_range:
-            if 0 <= x < self.grid_size and 0 <= y < self.grid_height:
-                if world.grid[y][x]:
-                    self.map[y][x] = 1
-
-    def save_map(self, run_id):
-        import matplotlib.pyplot as plt
-        plt.figure(figsize=(10, 13))
-        plt.imshow(self.map, cmap='gray_r')
-        plt.title(f'Cat\'s Map - Run {run_id}')
-        plt.savefig(f'cat_maps/run_{run_id}_map.png')
-        plt.close()
-
-class Rat:
-    def __init__(self, x, y, world):
-        self.x = x
-        self.y = y
-        self.world = world
-        self.patrol_radius = 4
-        self.patrol_area = self.get_patrol_area()
-        self.is_alive = True
-
-    def get_patrol_area(self):
-        x_start = max(0, self.x - self.patrol_radius)
-        x_end = min(self.world.grid_size - 1, self.x + self.patrol_radius)
-        y_start = max(0, self.y - self.patrol_radius)
-        y_end = min(self.world.grid_height - 1, self.y + self.patrol_radius)
-        return [(x, y) for x in range(x_start, x_end + 1) for y in range(y_start, y_end + 1)]
-
-    def move(self):
-        if not self.is_alive:
+        perception = current_perception(cat)
+        y0, y1, x0, x1, seen = perception.seen
+        if y1 <= y0:
             return
-        self.world.grid[self.y][self.x] = None
-        new_x, new_y = random.choice(self.patrol_area)
-        self.x, self.y = new_x, new_y
-        self.world.grid[self.y][self.x] = ('rat', f'rat_{chr(97 + self.world.rats.index(self))}')
-
-    def die(self):
-        self.is_alive = False
-        self.world.grid[self.y][self.x] = None
-        print(f"Rat at ({self.x}, {self.y}) has died.")
\ No newline at end of file
+        profiler.count('cells.cat_mapper', (y1 - y0) * (x1 - x0))
+        rows = self.rows[:y1 - y0]
+        rows[:, x0:x1] = seen
+        bits = np.packbits(rows, axis=1)
+        rows[:, x0:x1] = False
+        current = self.packed[y0:y1]
+        new = bits & ~current
+        if new.any():
+            self.explored += int(BIT_COUNT[new].sum())
+            current |= new
+
+    def save_map(self, run_id, directory=None, scale=8, background=False):
+        # Black = explored. With background=True the PNG is written on a
+        # thread from a snapshot of the map; the thread is returned.
+        path = f'{directory or map_dir()}/run_{run_id}_map.png'
+        packed = self.packed.copy()
+        if not background:
+            write_bitmap_png(path, packed, self.grid_size, scale)
+            return path
+        thread = threading.Thread(target=write_bitmap_png, args=(path, packed, self.grid_size, scale), daemon=True)
+        thread.start()
+        return thread
\ No newline at end of file
@@ -1,6 +1,3 @@
-import random
-import math
-
 class CatPolicies:
     def __init__(self, cat, world, chem_manager):
         self.cat = cat
@@ -10,11 +7,11 @@ class CatPolicies:
     def random_walk(self):
         # Policy A: 4 random walk steps
         for _ in range(4):
-            dx = random.choice([-1, 0, 1])
-            dy = random.choice([-1, 0, 1])
+            dx = self.world.rng.choice([-1, 0, 1])
+            dy = self.world.rng.choice([-1, 0, 1])
             
             # Ensure at least 1 step forward and at most 1 step backward
-            if dy > 0 or (dy == 0 and random.random() < 0.5):
+            if dy > 0 or (dy == 0 and self.world.rng.random() < 0.5):
                 dy = 1
             elif dy < 0:
                 dy = -1
@@ -44,16 +41,7 @@ class CatPolicies:
         return False  # Continue moving
 
     def find_nearest_bush(self):
-        nearest_bush = None
-        min_distance = float('inf')
-        for y in range(self.world.grid_size):
-            for x in range(self.world.grid_size):
-                if self.world.grid[y][x] and self.world.grid[y][x][0] == 'bush':
-                    distance = math.sqrt((x - self.cat.x)**2 + (y - self.cat.y)**2)
-                    if distance < min_distance:
-                        min_distance = distance
-                        nearest_bush = (x, y)
-        return nearest_bush
+        return self.world.nearest('bush', self.cat.x, self.cat.y)
 
     def food_in_sight(self):
         # Check if food is in the cat's field of view
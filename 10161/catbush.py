@@ -1,68 +1,69 @@
-import math
+from perception import current_perception
+from common.events import log
+from collision import apply_collision_rules
 
 class CatBush:
-    def __init__(self, cat, world, chem_manager):
+    def __init__(self, cat, world, chem_manager, reset_delay=0):
         self.cat = cat
         self.world = world
         self.chem_manager = chem_manager
+        self.reset_delay = reset_delay  # Simulated seconds between finishing the last bush and the reset
+        self.reset_event = None
         self.cat.initialize_bush_done()  # Initialize bush_done dict
+        self.bush_pools = {}  # Bush name -> BushDone pool handle
 
-    def check_bush_interaction(self):
-        for dy in range(-self.cat.bush_interaction_radius, self.cat.bush_interaction_radius + 1):
-            for dx in range(-self.cat.bush_interaction_radius, self.cat.bush_interaction_radius + 1):
-                x = self.cat.x + dx
-                y = self.cat.y + dy
-                if 0 <= x < self.world.grid_size and 0 <= y < self.world.grid_height:
-                    cell = self.world.grid[y][x]
-                    if isinstance(cell, tuple) and cell[0] == 'bush':
-                        bush_name = cell[1]
-                        if bush_name not in self.cat.bush_done:
-                            self.cat.bush_done[bush_name] = 0
-                        if self.cat.bush_done[bush_name] < 4:
-                            self.cat.bush_done[bush_name] += 1
-                            self.chem_manager.get_pool(f'BushDone{bush_name[-1]}').add(1)
-                            
-                            if self.cat.bush_done[bush_name] == 4:
-                                self.cat.bush_counter += 1
-                                
-                                if self.cat.bush_counter == len(self.cat.bush_done):
-                                    self.reset_bush_interactions()
-                        return
+    def bush_pool(self, bush_name):
+        pool = self.bush_pools.get(bush_name)
+        if pool is None:
+            pool = self.bush_pools[bush_name] = self.chem_manager.get_pool(f'BushDone{bush_name[-1]}')
+        return pool
+
+    def check_bush_interaction(self, perception=None):
+        if perception is None:
+            perception = current_perception(self.cat)
+        if perception.bush is None:
+            return
+        bush_name = perception.bush[2]
+        if bush_name not in self.cat.bush_done:
+            self.cat.bush_done[bush_name] = 0
+        if self.cat.bush_done[bush_name] < 4:
+            self.cat.bush_done[bush_name] += 1
+            self.bush_pool(bush_name).add(1)
+
+            if self.cat.bush_done[bush_name] == 4:
+                self.cat.bush_counter += 1
+                self.cat.bushes_completed += 1
+
+                if self.cat.bush_counter == len(self.cat.bush_done):
+                    if not self.reset_delay:
+                        self.reset_bush_interactions()
+                    elif self.reset_event is None:
+                        self.reset_event = self.world.scheduler.after(self.reset_delay, self.reset_bush_interactions)
 
     def reset_bush_interactions(self):
+        self.reset_event = None
         self.cat.bush_counter = 0
         for bush in self.cat.bush_done:
             self.cat.bush_done[bush] = 0
-            self.chem_manager.get_pool(f'BushDone{bush[-1]}').reduce(4)
-        print("Bush interactions reset")
+            self.bush_pool(bush).reduce(4)
+        log.info('bush_interactions_reset', tick=self.world.tick)
 
     def find_nearest_bush(self):
-        nearest_bush = None
-        min_distance = float('inf')
-        
-        for y in range(self.world.grid_height):
-            for x in range(self.world.grid_size):
-                cell = self.world.grid[y][x]
-                if isinstance(cell, tuple) and cell[0] == 'bush':
-                    bush_name = cell[1]
-                    if bush_name not in self.cat.bush_done:
-                        self.cat.bush_done[bush_name] = 0
-                    if self.cat.bush_done[bush_name] < 4:
-                        distance = math.sqrt((x - self.cat.x)**2 + (y - self.cat.y)**2)
-                        if distance < min_distance:
-                            min_distance = distance
-                            nearest_bush = (x, y)
-        
-        return nearest_bush
+        return self.world.nearest('bush', self.cat.x, self.cat.y, skip=self.is_bush_done)
+
+    def is_bush_done(self, cell):
+        bush_name = cell[1]
+        if bush_name not in self.cat.bush_done:
+            self.cat.bush_done[bush_name] = 0
+        return self.cat.bush_done[bush_name] >= 4
 
     def move_towards_bush(self):
-        nearest_bush = self.find_nearest_bush()
-        if nearest_bush:
-            bush_x, bush_y = nearest_bush
-            dx = bush_x - self.cat.x
-            dy = bush_y - self.cat.y
-            
-            if abs(dx) > abs(dy):
-                self.cat.x += 1 if dx > 0 else -1
-            else:
-                self.cat.y += 1 if dy > 0 else -1
\ No newline at end of file
+        # One step down the flow field of the bushes still viable: the path
+        # goes around walls and the nearest bush is the nearest by path
+        world = self.world
+        viable = [pos for pos in world.positions['bush'] if not self.is_bush_done(world.cell(*pos))]
+        if not viable:
+            return
+        step = world.flow.towards(viable).next_step(self.cat.x, self.cat.y)
+        if step:
+            apply_collision_rules(self.cat, step[0], step[1], self.cat.collision_handler)
\ No newline at end of file
@@ -0,0 +1,370 @@
+import numpy as np
+from look import build_stencils, zone_of_row
+from collision import CollisionHandler
+from world import FOOD, RAT, KIND_NAMES
+from chemstore import ChemStore
+from ecs import Table, Systems
+from flowfield import STEPS as FLOW_STEPS, UNREACHABLE
+
+DIRECTIONS = ['up', 'right', 'down', 'left']  # Same rotation order as CatLook
+UP, RIGHT, DOWN, LEFT = range(4)
+STRESS = 4  # Stencil index for stress vision, after the four directions
+PHASES = ['1a', '1b', '2', '3', '4']
+NEXT_PHASE = np.array([1, 1, 3, 4, 0])  # CatLook.update_phase on food/rat: 1a->1b, 2->3, 3->4, 4->1a
+STEPS = np.array([(0, 1), (0, -1), (1, 0), (-1, 0)])  # (dx, dy) tried by CatWalkChase.random_walk
+NO_TARGET = -1
+
+class CatSwarm(Table):
+    # Many cats in one World as a table of cat entities (see ecs.Table), one
+    # row per cat. step() runs the systems in order, applying the same
+    # per-tick behaviour as Cat/CatLook/CatBush/CatWalkChase with the
+    # phase-based look strategy to all cats at once.
+    COMPONENTS = {
+        'x': np.int64, 'y': np.int64,
+        'phase': np.int8, 'look_direction': np.int8, 'stress_vision': bool,
+        'food_eaten': np.int32,
+        'last_zone': np.int64, 'last_side': np.int8, 'last_orient': np.int64,
+        'target_x': np.int64, 'target_y': np.int64, 'target_kind': np.int8,  # FOOD/RAT while chasing
+        'bush_counter': np.int32, 'bushes_completed': np.int64,
+    }
+
+    def __init__(self, world, n_cats, positions=None, rng=None, bush_seek_chance=0.7, orient_interval=25):
+        self.world = world
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.bush_seek_chance = bush_seek_chance
+        self.orient_interval = orient_interval  # Ticks between bush orientations (5 s at 5 FPS)
+        self.bush_interaction_radius = 2
+        self.collision_handler = CollisionHandler(world)
+        stencils = build_stencils(6, 12, 10)
+        self.stencils = [stencils[name] for name in DIRECTIONS + ['stress']]
+
+        self.refresh_bushes()
+        components = dict(self.COMPONENTS)
+        components['bush_done'] = (np.int16, (len(self.bush_names),))
+        components['bush_visits'] = (np.int64, (len(self.bush_names),))  # Never reset
+        super().__init__(components, capacity=n_cats)
+        if positions is None:
+            positions = [(world.grid_size // 2, world.grid_height - 1)] * n_cats
+        for x, y in np.asarray(positions, dtype=np.int64).reshape(n_cats, 2):
+            self.add(x=x, y=y, look_direction=UP, last_zone=-1, last_side=-1, target_kind=NO_TARGET)
+        self.chem = ChemStore(['ChemA'], agents=n_cats)  # Pools x cats
+        self.chem_a = self.chem.row('ChemA')
+        self.rats_eaten = 0
+        self.food_eaten_total = 0
+
+        # Per-tick systems, in order
+        self.systems = Systems()
+        self.systems.add('swarm.look', self.look_system)
+        self.systems.add('swarm.hunt', self.hunt_system)
+        self.systems.add('swarm.bushes', self.bush_system)
+        self.systems.add('swarm.policy', self.policy_system)
+        self.systems.add('swarm.chemistry', self.chem_system)
+
+    def refresh_bushes(self):
+        # Bush cells in row order, and which bush (column of bush_done) each belongs to
+        world = self.world
+        cells = world.cells_of('bush')
+        names = [world.names[world.entity[y, x]] for x, y in cells]
+        self.bush_names = list(dict.fromkeys(names))
+        columns = {name: i for i, name in enumerate(self.bush_names)}
+        self.bush_x = np.array([x for x, _ in cells], dtype=np.int64)
+        self.bush_y = np.array([y for _, y in cells], dtype=np.int64)
+        self.bush_column = np.array([columns[name] for name in names], dtype=np.int64)
+
+    def cat(self, row):
+        return CatView(self, row)
+
+    def chasing(self):
+        return self.target_kind != NO_TARGET
+
+    def step(self, tick):
+        self.systems.run(tick)
+
+    def look_system(self, tick):
+        # CatLook.update
+        self.update_strategy(tick)
+        self.look(np.arange(self.n))
+        self.stress_vision |= self.target_kind == RAT  # Maintain stress vision while chasing a rat
+
+    def hunt_system(self, tick):
+        # Cat.update
+        chasing = self.chasing()
+        arrived = chasing & (self.x == self.target_x) & (self.y == self.target_y)
+        self.catch(np.flatnonzero(arrived))
+        self.chase_step(np.flatnonzero(chasing & ~arrived))
+        self.random_walk(np.flatnonzero(~chasing))
+
+    def bush_system(self, tick):
+        self.bush_interaction(np.arange(self.n))
+
+    def policy_system(self, tick):
+        # Policy roll from main.py
+        chasing = self.chasing()
+        seek = ~chasing & (self.rng.random(self.n) < self.bush_seek_chance)
+        self.chase_step(np.flatnonzero(chasing))
+        self.move_towards_bush(np.flatnonzero(seek))
+        self.random_walk(np.flatnonzero(~chasing & ~seek))
+
+    def chem_system(self, tick):
+        self.chem.step()
+
+    def update_strategy(self, tick):
+        # PhaseBasedStrategy.update; cats in stress vision keep their direction
+        calm = ~self.stress_vision
+        due = np.flatnonzero(calm & (tick - self.last_orient >= self.orient_interval))
+        self.orient_to_nearest_bush(due)
+        self.last_orient[due] = tick
+
+        rotate = calm & (self.food_eaten > 0)
+        self.look_direction[rotate] = (self.look_direction[rotate] + 1) % 4
+        self.food_eaten[rotate] = 0
+
+        self.check_phase_transition(np.flatnonzero(calm))
+
+    def check_phase_transition(self, idx):
+        zone = zone_of_row(self.y[idx], self.world.grid_height)
+        side = (self.x[idx] >= self.world.grid_size // 2).astype(np.int8)
+        last_zone, last_side = self.last_zone[idx], self.last_side[idx]
+        moved = ((last_zone >= 0) & (zone != last_zone)) | ((last_side >= 0) & (side != last_side))
+        switch = idx[(self.phase[idx] == 1) & moved]
+        self.phase[switch] = 2
+        self.look_direction[switch] = (self.look_direction[switch] + 1) % 4
+        self.last_zone[idx] = zone
+        self.last_side[idx] = side
+
+    def nearest_viable_bush(self, idx):
+        # Nearest bush cell whose bush_done is still below 4, per cat; ties go to the lowest (y, x)
+        if len(self.bush_x) == 0:
+            return np.zeros(len(idx), np.int64), np.zeros(len(idx), np.int64), np.zeros(len(idx), bool)
+        dx = self.bush_x[None, :] - self.x[idx, None]
+        dy = self.bush_y[None, :] - self.y[idx, None]
+        distance = (dx * dx + dy * dy).astype(float)
+        distance[self.bush_done[idx][:, self.bush_column] >= 4] = np.inf
+        best = np.argmin(distance, axis=1)
+        found = np.isfinite(distance[np.arange(len(idx)), best])
+        return self.bush_x[best], self.bush_y[best], found
+
+    def orient_to_nearest_bush(self, idx):
+        bush_x, bush_y, found = self.nearest_viable_bush(idx)
+        idx, dx, dy = idx[found], bush_x[found] - self.x[idx[found]], bush_y[found] - self.y[idx[found]]
+        self.look_direction[idx] = np.where(np.abs(dx) > np.abs(dy),
+                                            np.where(dx > 0, RIGHT, LEFT),
+                                            np.where(dy > 0, DOWN, UP))
+
+    def find_targets(self, idx):
+        # Index of the first food/rat cell (row order) inside each cat's stencil, or -1
+        world = self.world
+        cells = sorted([(y, x, FOOD) for x, y in world.positions['food']] +
+                       [(y, x, RAT) for x, y in world.positions['rat']])
+        hit = np.full(len(idx), -1)
+        if not cells or len(idx) == 0:
+            return hit, None
+        cells = np.array(cells, dtype=np.int64)
+        cell_y, cell_x = cells[:, 0], cells[:, 1]
+
+        stencil = np.where(self.stress_vision[idx], STRESS, self.look_direction[idx])
+        for s, (oy, ox, mask) in enumerate(self.stencils):
+            rows = np.flatnonzero(stencil == s)
+            if len(rows) == 0:
+                continue
+            cats = idx[rows]
+            ry = cell_y[None, :] - self.y[cats, None] - oy
+            rx = cell_x[None, :] - self.x[cats, None] - ox
+            height, width = mask.shape
+            inside = (ry >= 0) & (ry < height) & (rx >= 0) & (rx < width)
+            seen = inside & mask[np.clip(ry, 0, height - 1), np.clip(rx, 0, width - 1)]
+            first = np.argmax(seen, axis=1)
+            found = seen[np.arange(len(rows)), first]
+            hit[rows[found]] = first[found]
+        return hit, cells
+
+    def look(self, idx):
+        # CatLook.check_for_food_or_rat for the given cats
+        hit, cells = self.find_targets(idx)
+        seen = hit >= 0
+        cats, which = idx[seen], hit[seen]
+        if len(cats):
+            self.target_y[cats] = cells[which, 0]
+            self.target_x[cats] = cells[which, 1]
+            self.target_kind[cats] = cells[which, 2]
+            is_rat = cells[which, 2] == RAT
+            self.chem_a[cats] += np.where(is_rat, 5, 1)  # STRESS^^^^ / STRESS^
+            self.stress_vision[cats[is_rat]] = True
+            self.food_eaten[cats] += 1  # PhaseBasedStrategy.on_food_eaten
+            self.update_phase(cats, is_rat)
+
+        lost = idx[~seen]
+        lost = lost[(self.target_kind[lost] == NO_TARGET) & self.stress_vision[lost]]
+        self.stress_vision[lost] = False
+
+    def update_phase(self, cats, is_rat):
+        self.phase[cats] = NEXT_PHASE[self.phase[cats]]
+        self.stress_vision[cats[is_rat]] = False
+
+    def catch(self, idx):
+        # Cat.update: already standing on the target
+        for i in idx:
+            if self.target_kind[i] == RAT and self.world.remove_rat(self.x[i], self.y[i]):
+                self.rats_eaten += 1
+        self.target_kind[idx] = NO_TARGET
+        self.stress_vision[idx] = False
+
+    def chase_step(self, idx):
+        # CatWalkChase.chase_target: one step along the longer axis
+        if len(idx) == 0:
+            return
+        dx = self.target_x[idx] - self.x[idx]
+        dy = self.target_y[idx] - self.y[idx]
+        horizontal = np.abs(dx) > np.abs(dy)
+        new_x = self.x[idx] + np.where(horizontal, np.where(dx > 0, 1, -1), 0)
+        new_y = self.y[idx] + np.where(horizontal, 0, np.where(dy > 0, 1, -1))
+        valid = self.collision_handler.valid_moves(new_x, new_y)
+        self.x[idx[valid]] = new_x[valid]
+        self.y[idx[valid]] = new_y[valid]
+
+        arrived = (self.x[idx] == self.target_x[idx]) & (self.y[idx] == self.target_y[idx])
+        self.eat(idx[arrived])
+
+    def eat(self, idx):
+        # CatWalkChase.eat_target
+        world = self.world
+        for i in idx:
+            x, y = int(self.x[i]), int(self.y[i])
+            if self.target_kind[i] == RAT:
+                self.chem_a[i] = max(0, self.chem_a[i] - 5)  # Remove STRESS^^^^
+                if world.remove_rat(x, y):
+                    self.rats_eaten += 1
+            else:
+                self.chem_a[i] = max(0, self.chem_a[i] - 1)  # Remove STRESS^
+                if world.kind[y, x] == FOOD:
+                    world.set_cell(x, y, None)
+                    self.food_eaten_total += 1
+        is_rat = self.target_kind[idx] == RAT
+        self.target_kind[idx] = NO_TARGET
+        self.update_phase(idx, is_rat)
+
+    def random_walk(self, idx):
+        # CatWalkChase.random_walk: two steps in a random valid direction,
+        # looking around after each and stopping once something is spotted
+        for _ in range(2):
+            if len(idx) == 0:
+                return
+            order = np.argsort(self.rng.random((len(idx), 4)), axis=1)
+            new_x = self.x[idx, None] + STEPS[order, 0]  # (cats, 4 shuffled directions)
+            new_y = self.y[idx, None] + STEPS[order, 1]
+            first, ok = self.collision_handler.first_valid(new_x, new_y)
+            rows = np.flatnonzero(ok)
+            self.x[idx[rows]] = new_x[rows, first[rows]]
+            self.y[idx[rows]] = new_y[rows, first[rows]]
+            self.look(idx)
+            idx = idx[self.target_kind[idx] == NO_TARGET]
+
+    def move_towards_bush(self, idx):
+        # CatBush.move_towards_bush: one step down the flow field of each
+        # cat's viable bushes, through the collision rules. Cats with the
+        # same viable bushes share a field (cached by World.flow).
+        if len(idx) == 0 or len(self.bush_x) == 0:
+            return
+        groups, which = np.unique(self.bush_done[idx] < 4, axis=0, return_inverse=True)
+        which = which.reshape(-1)
+        new_x, new_y = self.x[idx], self.y[idx]  # Copies (fancy indexing)
+        for group, viable in enumerate(groups):
+            if not viable.any():
+                continue
+            cells = viable[self.bush_column]
+            field = self.world.flow.towards(zip(self.bush_x[cells].tolist(), self.bush_y[cells].tolist()))
+            rows = np.flatnonzero(which == group)
+            x, y = new_x[rows], new_y[rows]
+            direction = field.direction[y, x]
+            rows = rows[(direction != UNREACHABLE) & (field.dist[y, x] != 0)]
+            step = FLOW_STEPS[field.direction[new_y[rows], new_x[rows]]]
+            new_x[rows] += step[:, 0]
+            new_y[rows] += step[:, 1]
+        valid = self.collision_handler.valid_moves(new_x, new_y)
+        self.x[idx[valid]] = new_x[valid]
+        self.y[idx[valid]] = new_y[valid]
+
+    def bush_interaction(self, idx):
+        # CatBush.check_bush_interaction: the first bush cell (row order) within the radius counts
+        if len(self.bush_x) == 0 or len(idx) == 0:
+            return
+        r = self.bush_interaction_radius
+        near = ((np.abs(self.bush_x[None, :] - self.x[idx, None]) <= r) &
+                (np.abs(self.bush_y[None, :] - self.y[idx, None]) <= r))
+        first = np.argmax(near, axis=1)
+        has = near[np.arange(len(idx)), first]
+        cats, columns = idx[has], self.bush_column[first[has]]
+        open_bush = self.bush_done[cats, columns] < 4
+        cats, columns = cats[open_bush], columns[open_bush]
+
+        self.bush_done[cats, columns] += 1
+        self.bush_visits[cats, columns] += 1
+        completed = cats[self.bush_done[cats, columns] == 4]
+        self.bush_counter[completed] += 1
+        self.bushes_completed[completed] += 1
+
+        reset = completed[self.bush_counter[completed] == len(self.bush_names)]
+        self.bush_counter[reset] = 0
+        self.bush_done[reset] = 0
+
+class CatView:
+    # Single-cat attribute access over one row of a CatSwarm
+    def __init__(self, swarm, row):
+        self.swarm = swarm
+        self.row = row
+        self.world = swarm.world
+
+    @property
+    def x(self):
+        return int(self.swarm.x[self.row])
+
+    @x.setter
+    def x(self, value):
+        self.swarm.x[self.row] = value
+
+    @property
+    def y(self):
+        return int(self.swarm.y[self.row])
+
+    @y.setter
+    def y(self, value):
+        self.swarm.y[self.row] = value
+
+    @property
+    def phase(self):
+        return PHASES[self.swarm.phase[self.row]]
+
+    @phase.setter
+    def phase(self, value):
+        self.swarm.phase[self.row] = PHASES.index(value)
+
+    @property
+    def look_direction(self):
+        return DIRECTIONS[self.swarm.look_direction[self.row]]
+
+    @look_direction.setter
+    def look_direction(self, value):
+        self.swarm.look_direction[self.row] = DIRECTIONS.index(value)
+
+    @property
+    def stress_vision(self):
+        return bool(self.swarm.stress_vision[self.row])
+
+    @stress_vision.setter
+    def stress_vision(self, value):
+        self.swarm.stress_vision[self.row] = value
+
+    @property
+    def chasing(self):
+        kind = self.swarm.target_kind[self.row]
+        if kind == NO_TARGET:
+            return None
+        return (int(self.swarm.target_x[self.row]), int(self.swarm.target_y[self.row]), KIND_NAMES[kind])
+
+    @property
+    def bush_done(self):
+        return {name: int(count) for name, count in zip(self.swarm.bush_names, self.swarm.bush_done[self.row])}
+
+    @property
+    def chem_a(self):
+        return int(self.swarm.chem_a[self.row])
@@ -1,19 +1,26 @@
-class ChemPool:
-    def __init__(self, initial_value=0):
-        self.value = initial_value
+from chemstore import ChemStore
 
-    def add(self, amount):
-        self.value += amount
-
-    def reduce(self, amount):
-        self.value = max(0, self.value - amount)
+BUSH_POOLS = [f'BushDone{letter}' for letter in 'ABCDEF']
 
 class ChemManager:
-    def __init__(self):
-        self.pools = {
-            'ChemA': ChemPool(),
-            # Add other chemical pools as needed
-        }
+    # Name-based access to a ChemStore. get_pool returns a handle that stays
+    # valid, so resolve it once at setup and keep it; unknown names are
+    # registered rather than handed a throwaway pool. decay is {pool: rate}
+    # and couplings (source, target, rate) triples, see ChemStore.step.
+    def __init__(self, store=None, decay=None, couplings=()):
+        self.store = store or ChemStore(['ChemA'] + BUSH_POOLS)
+        for name, rate in (decay or {}).items():
+            self.store.set_decay(name, rate)
+        for source, target, rate in couplings:
+            self.store.couple(source, target, rate)
+
+    @property
+    def pools(self):
+        return {name: self.store.pool(name) for name in self.store.names}
 
     def get_pool(self, name):
-        return self.pools.get(name, ChemPool())
\ No newline at end of file
+        return self.store.pool(name)
+
+    def update_pools(self):
+        # Decay and coupling for every pool, see ChemStore.step
+        self.store.step()
@@ -0,0 +1,106 @@
+import numpy as np
+
+class ChemPool:
+    # Handle on one pool of one agent, resolved once: add/reduce/value go
+    # straight to the store's array without a name lookup
+    __slots__ = ('store', 'name', 'row', 'agent')
+
+    def __init__(self, store, name, row, agent=0):
+        self.store = store
+        self.name = name
+        self.row = row
+        self.agent = agent
+
+    @property
+    def value(self):
+        return self.store.values[self.row, self.agent].item()
+
+    @value.setter
+    def value(self, value):
+        self.store.values[self.row, self.agent] = value
+
+    def get_value(self):
+        return self.value
+
+    def add(self, amount):
+        self.store.values[self.row, self.agent] += amount
+
+    def reduce(self, amount):
+        values = self.store.values
+        values[self.row, self.agent] = max(0, values[self.row, self.agent] - amount)
+
+class ChemStore:
+    # Every pool of every agent in one (pools, agents) array. Pools are
+    # registered by name at setup and then used through ChemPool handles or
+    # whole rows (one value per agent). step() applies decay and coupling to
+    # all of them at once; with no rules set it does nothing. Rows live in a
+    # buffer of `capacity` pools, so registering more pools never moves the
+    # rows already handed out.
+    def __init__(self, names=(), agents=1, dtype=np.float64, capacity=16):
+        self.agents = agents
+        self.names = []
+        self.rows = {}
+        self.buffer = np.zeros((max(capacity, len(names)), agents), dtype=dtype)
+        self.values = self.buffer[:0]  # The registered rows
+        self.decay = np.zeros(len(self.buffer))
+        self.coupling = np.zeros((len(self.buffer),) * 2)  # coupling[target, source]: fraction of source moved per step
+        self.viewed = False  # Set once row() has handed out a view
+        self.kinetics = False
+        for name in names:
+            self.register(name)
+
+    def register(self, name, initial=0):
+        if name in self.rows:
+            return self.rows[name]
+        row = len(self.names)
+        if row == len(self.buffer):
+            self.grow()
+        self.names.append(name)
+        self.rows[name] = row
+        self.values = self.buffer[:row + 1]
+        self.values[row] = initial
+        return row
+
+    def grow(self):
+        # A new buffer would detach the row views already handed out
+        if self.viewed:
+            raise RuntimeError(f"ChemStore is full ({len(self.buffer)} pools) and rows are in use; "
+                               "pass a larger capacity")
+        capacity = 2 * len(self.buffer)
+        buffer = np.zeros((capacity, self.agents), dtype=self.buffer.dtype)
+        buffer[:len(self.buffer)] = self.buffer
+        decay = np.zeros(capacity)
+        decay[:len(self.decay)] = self.decay
+        coupling = np.zeros((capacity, capacity))
+        coupling[:len(self.coupling), :len(self.coupling)] = self.coupling
+        self.buffer, self.decay, self.coupling = buffer, decay, coupling
+
+    def pool(self, name, agent=0):
+        return ChemPool(self, name, self.register(name), agent)
+
+    def row(self, name):
+        # View of one pool across all agents (writes go into the store)
+        row = self.register(name)
+        self.viewed = True
+        return self.buffer[row]
+
+    def set_decay(self, name, rate):
+        # Fraction of the pool lost per step
+        self.decay[self.register(name)] = rate
+        self.kinetics = True
+
+    def couple(self, source, target, rate):
+        # Fraction of source turned into target per step
+        self.coupling[self.register(target), self.register(source)] = rate
+        self.kinetics = True
+
+    def step(self):
+        if not self.kinetics:
+            return
+        values = self.values
+        n = len(values)
+        coupling = self.coupling[:n, :n]
+        moved = coupling @ values - coupling.sum(axis=0)[:, None] * values
+        values += moved
+        values *= (1 - self.decay[:n])[:, None]
+        np.maximum(values, 0, out=values)
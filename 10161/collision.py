@@ -1,35 +1,38 @@
+import numpy as np
+from world import SEPARATOR, BRIDGE
+
 class CollisionHandler:
+    # Moves are checked against world.passable, which World keeps in step
+    # with the separator and bridge cells it actually placed
     def __init__(self, world):
         self.world = world
 
     def is_valid_move(self, x, y):
-        # Check if the position is within the grid
-        if not (0 <= x < self.world.grid_size and 0 <= y < self.world.grid_height):
-            return False
-
-        # Check for collision with bridge
-        if self.is_bridge(x, y):
-            return False
-
-        # Check for collision with separator
-        if self.is_separator(x, y):
-            return False
-
-        return True
+        # Check if the position is within the grid and not on the bridge or separator
+        world = self.world
+        return 0 <= x < world.grid_size and 0 <= y < world.grid_height and bool(world.passable[y, x])
+
+    def valid_moves(self, xs, ys):
+        # is_valid_move for arrays of candidate positions of any shape, e.g.
+        # (agents, candidates), scalars included; one bool per candidate.
+        # Off-grid candidates read a clipped cell and are masked out.
+        xs, ys = np.asarray(xs), np.asarray(ys)
+        world = self.world
+        inside = (xs >= 0) & (xs < world.grid_size) & (ys >= 0) & (ys < world.grid_height)
+        passable = world.passable[np.clip(ys, 0, world.grid_height - 1), np.clip(xs, 0, world.grid_size - 1)]
+        return inside & passable
+
+    def first_valid(self, xs, ys):
+        # For (agents, candidates) arrays: index of each agent's first valid
+        # candidate and whether it has one
+        valid = self.valid_moves(xs, ys)
+        return np.argmax(valid, axis=1), valid.any(axis=1)
 
     def is_bridge(self, x, y):
-        # Assuming the bridge is at the center of the grid
-        bridge_y = self.world.grid_height // 2
-        bridge_width = self.world.grid_size // 5  # Adjust this value based on your bridge width
-        bridge_start = (self.world.grid_size - bridge_width) // 2
-        bridge_end = bridge_start + bridge_width
-
-        return y == bridge_y and bridge_start <= x < bridge_end
+        return self.world.kind[y, x] == BRIDGE
 
     def is_separator(self, x, y):
-        # Assuming the separator is a vertical line in the middle of the grid
-        separator_x = self.world.grid_size // 2
-        return x == separator_x and y != self.world.grid_height // 2  # Allow movement on the bridge level
+        return self.world.kind[y, x] == SEPARATOR
 
 def apply_collision_rules(cat, new_x, new_y, collision_handler):
     if collision_handler.is_valid_move(new_x, new_y):
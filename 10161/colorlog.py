@@ -0,0 +1,95 @@
+import time
+import sqlite3
+import threading
+from collections import deque
+import numpy as np
+from datetime import datetime
+from config import DB_PATH
+from world import BUSH
+from perception import current_perception
+
+COLOR_LOGS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS color_logs (
+        id INTEGER PRIMARY KEY,
+        timestamp TEXT,
+        object_type TEXT,
+        color TEXT
+    )
+'''
+COLOR_LOGS_INDEX = '''
+    CREATE INDEX IF NOT EXISTS color_logs_type_time ON color_logs (object_type, timestamp)
+'''
+
+def create_color_logs(conn):
+    # Create tables for logging if they don't exist
+    conn.execute(COLOR_LOGS_TABLE)
+    conn.execute(COLOR_LOGS_INDEX)
+    conn.commit()
+
+class ColorLog:
+    # Observations are appended to an in-memory queue (a deque append, no
+    # formatting) and written by a background thread with executemany, one
+    # transaction per batch of batch_size rows or every flush_ms milliseconds.
+    def __init__(self, path=DB_PATH, batch_size=1000, flush_ms=200):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_ms = flush_ms
+        self.queue = deque()
+        self.written = 0
+        self.wakeup = threading.Event()
+        self.stopping = False
+        self.thread = threading.Thread(target=self._run, name='color-log-writer', daemon=True)
+        self.thread.start()
+
+    def log(self, object_type, color, timestamp=None):
+        self.queue.append((timestamp or time.time(), object_type, color))
+        if len(self.queue) >= self.batch_size:
+            self.wakeup.set()
+
+    def on_tick(self, sim):
+        # Simulation observer: log every bush in the cat's view, once per
+        # bush per tick, with the bush's own color (a rat on it doesn't count)
+        world = sim.world
+        y0, y1, x0, x1, seen = current_perception(sim.cat).seen
+        ys, xs = np.nonzero(seen & (world.kind[y0:y1, x0:x1] == BUSH))
+        logged = set()
+        for y, x in zip((ys + y0).tolist(), (xs + x0).tolist()):
+            name = world.names[world.entity[y, x]]
+            if name not in logged:
+                logged.add(name)
+                self.log(name, world.object_color(x, y))
+
+    def _run(self):
+        # SQLite connections belong to the thread that opened them
+        conn = sqlite3.connect(self.path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        create_color_logs(conn)
+        while not self.stopping:
+            self.wakeup.wait(self.flush_ms / 1000)
+            self.wakeup.clear()
+            self._write(conn)
+        self._write(conn)
+        conn.close()
+
+    def _write(self, conn):
+        popleft = self.queue.popleft
+        rows = []
+        try:
+            while True:
+                timestamp, object_type, color = popleft()
+                rows.append((datetime.fromtimestamp(timestamp).isoformat(), object_type, str(color)))
+        except IndexError:
+            pass
+        if rows:
+            with conn:
+                conn.executemany('INSERT INTO color_logs (timestamp, object_type, color) VALUES (?, ?, ?)', rows)
+            self.written += len(rows)
+
+    def close(self):
+        # Write whatever is still queued and stop the writer
+        if self.thread is not None:
+            self.stopping = True
+            self.wakeup.set()
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,20 @@
+# Plain constants only: importing this must not touch the display, disk or network
+
+# Screen setup
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+
+# Colors
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+
+# Grid settings
+GRID_SIZE = 64
+CELL_SIZE = min(SCREEN_WIDTH // GRID_SIZE, SCREEN_HEIGHT // GRID_SIZE)
+
+# Outputs
+DB_PATH = 'proto_cat_logs.db'
+MAP_DIR = 'cat_maps'
@@ -0,0 +1,93 @@
+import numpy as np
+from common.profiler import profiler
+
+# Entities and systems. A Table holds one kind of entity (World.rats, the
+# cats of a CatSwarm) with every component in its own contiguous array, one
+# row per entity; systems are plain functions run over whole tables in a
+# fixed order each tick. Terrain, bushes and food live in the World layers
+# (kind/entity per cell), which are already arrays indexed by position. The
+# single-cat Simulation only uses Systems, to order and time its phases.
+
+class Table:
+    # Live and just-removed entities sit in rows [0, n); ids are stable,
+    # rows move when compact() drops the removed ones. Components are given
+    # as {name: dtype} or {name: (dtype, shape)} for per-entity vectors.
+    def __init__(self, components, capacity=16):
+        self.components = {'id': (np.int32, ())}
+        for name, spec in components.items():
+            self.components[name] = spec if isinstance(spec, tuple) else (spec, ())
+        self.n = 0
+        self.dead = 0
+        self.next_id = 0
+        for name, (dtype, shape) in self.components.items():
+            setattr(self, name, np.zeros((capacity,) + shape, dtype=dtype))
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return self.n - self.dead
+
+    def grow(self):
+        capacity = 2 * len(self.alive)
+        for name in list(self.components) + ['alive']:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def add(self, **values):
+        # New entity from component values (missing ones are zero); returns its id
+        if self.n == len(self.alive):
+            self.grow()
+        i = self.n
+        for name, value in values.items():
+            getattr(self, name)[i] = value
+        self.id[i] = self.next_id
+        self.alive[i] = True
+        self.n += 1
+        self.next_id += 1
+        return self.next_id - 1
+
+    def living(self):
+        return np.flatnonzero(self.alive[:self.n])
+
+    def row(self, entity_id):
+        # Row of a living entity, or None
+        hits = np.flatnonzero((self.id[:self.n] == entity_id) & self.alive[:self.n])
+        return int(hits[0]) if len(hits) else None
+
+    def kill(self, i):
+        if self.alive[i]:
+            self.alive[i] = False
+            self.dead += 1
+
+    def compact(self):
+        # Drop removed entities, keeping the order of the living ones
+        if not self.dead:
+            return
+        n = self.n
+        keep = self.alive[:n].copy()
+        count = int(np.count_nonzero(keep))
+        for name in list(self.components) + ['alive']:
+            array = getattr(self, name)
+            array[:count] = array[:n][keep]
+        self.n = count
+        self.dead = 0
+
+class Systems:
+    # Per-tick systems, run in the order they were added; each one is timed
+    # under its name when the profiler is on
+    def __init__(self):
+        self.systems = []
+
+    def add(self, name, system):
+        self.systems.append((name, system))
+        return system
+
+    def names(self):
+        return [name for name, _ in self.systems]
+
+    def run(self, *args):
+        for name, system in self.systems:
+            t = profiler.start()
+            system(*args)
+            profiler.stop(name, t)
@@ -0,0 +1,174 @@
+import os
+import json
+import math
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from simulation import Simulation
+from world import World
+from heatmap import Heatmap, HeatmapRecorder
+from mapimage import write_bitmap_png
+from common.events import configure, WARNING
+from config import GRID_SIZE
+
+METRICS = ['bushes_completed', 'rats_eaten', 'chem_a', 'coverage']
+Z_95 = 1.96
+
+def run_one(seed, ticks, sample_every=100, keep_map=False, keep_heatmap=False, grid_size=GRID_SIZE):
+    # One seeded headless run; returns its metrics and the ChemA trajectory,
+    # plus the packed explored map and heatmap counts if asked for. Nothing
+    # is written here: the parent only saves runs it keeps in the report.
+    configure(WARNING)  # Per-event logging is off in workers
+    sim = Simulation(seed=seed, grid_size=grid_size)
+    if keep_heatmap:
+        recorder = HeatmapRecorder(sim.world.grid_size, sim.world.grid_height)
+        sim.attach(recorder)
+    chem_a = sim.chem_manager.get_pool('ChemA')
+    trajectory = [chem_a.value]
+    while sim.tick < ticks:
+        sim.run(ticks=min(sample_every, ticks - sim.tick))
+        trajectory.append(chem_a.value)
+    metrics = sim.metrics()
+    return {
+        'seed': seed,
+        'ticks': ticks,
+        'bushes_completed': metrics['bushes_completed'],
+        'rats_eaten': metrics['rats_eaten'],
+        'chem_a': metrics['chem_a'],
+        'coverage': sim.cat_mapper.coverage(),
+        'bush_done': metrics['bush_done'],
+        'chem_a_trajectory': trajectory,
+        'map': sim.cat_mapper.packed if keep_map else None,
+        'map_width': sim.cat_mapper.grid_size,  # The packed rows are padded to whole bytes
+        'heatmap_counts': recorder.counts if keep_heatmap else None,
+    }
+
+def save_outputs(result, maps_dir, heatmap):
+    # Write a kept run's map and add its counts to the heatmap file straight
+    # away, under the file's lock, so other farms can share the file
+    packed, width, counts = result.pop('map'), result.pop('map_width'), result.pop('heatmap_counts')
+    if maps_dir:
+        write_bitmap_png(os.path.join(maps_dir, f"run_{result['seed']}_map.png"), packed, width, scale=8)
+    if counts is not None:
+        heatmap.add(counts, [result['seed']])
+
+class RunningStats:
+    # Welford's online mean/variance
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    def std(self):
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else float('inf')
+
+    def half_width(self, z=Z_95):
+        return z * self.std() / math.sqrt(self.n) if self.n > 1 else float('inf')
+
+    def summary(self):
+        return {'n': self.n, 'mean': self.mean, 'std': self.std(), 'ci95': self.half_width()}
+
+def converged(stats, metrics, rel_tol, min_runs):
+    # Every chosen metric's 95% CI half-width is within rel_tol of its mean
+    for name in metrics:
+        s = stats[name]
+        if s.n < min_runs or s.half_width() > rel_tol * max(abs(s.mean), 1e-9):
+            return False
+    return True
+
+def farm(runs, ticks, out_path, workers=None, seed=0, metrics=None, rel_tol=None, min_runs=30, sample_every=100,
+         maps_dir=None, heatmap_path=None, grid_size=GRID_SIZE):
+    # Spread up to `runs` seeded runs over a process pool. With rel_tol set,
+    # stop as soon as the chosen metrics' confidence intervals are tight enough.
+    metrics = metrics or METRICS
+    workers = workers or os.cpu_count()
+    stats = {name: RunningStats() for name in METRICS}
+    results = []
+    stopped_early = False
+    if maps_dir:
+        os.makedirs(maps_dir, exist_ok=True)
+    heatmap = None
+    if heatmap_path:
+        world = World(grid_size=grid_size)
+        heatmap = Heatmap.create(heatmap_path, world.grid_size, world.grid_height)  # Adds to an existing one
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        seeds = iter(range(seed, seed + runs))
+        pending = set()
+
+        def submit_next():
+            next_seed = next(seeds, None)
+            if next_seed is not None:
+                pending.add(pool.submit(run_one, next_seed, ticks, sample_every, bool(maps_dir), bool(heatmap_path),
+                                        grid_size))
+
+        for _ in range(2 * workers):  # Keep every worker busy with one queued behind it
+            submit_next()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                save_outputs(result, maps_dir, heatmap)
+                results.append(result)
+                for name in METRICS:
+                    stats[name].add(result[name])
+            if rel_tol is not None and converged(stats, metrics, rel_tol, min_runs):
+                # Runs still in flight finish in the pool but are discarded
+                stopped_early = len(results) < runs
+                for future in pending:
+                    future.cancel()
+                break
+            for _ in done:
+                submit_next()
+
+    results.sort(key=lambda result: result['seed'])
+    seeds = [result['seed'] for result in results]
+    report = {
+        'config': {'runs': runs, 'ticks': ticks, 'seed': seed, 'metrics': metrics,
+                   'rel_tol': rel_tol, 'min_runs': min_runs, 'sample_every': sample_every,
+                   'maps_dir': maps_dir, 'heatmap': heatmap_path, 'grid_size': grid_size},
+        'completed_runs': len(results),
+        'seeds': seeds,  # Runs behind the summary, the maps and the heatmap counts
+        'stopped_early': stopped_early,
+        'summary': {name: stats[name].summary() for name in METRICS},
+        'runs': results,
+    }
+    with open(out_path, 'w') as f:
+        json.dump(report, f)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many seeded headless 10161 simulations in parallel")
+    parser.add_argument('--runs', type=int, default=1000)
+    parser.add_argument('--ticks', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first run, later runs count up")
+    parser.add_argument('--metrics', nargs='+', choices=METRICS, default=None,
+                        help="metrics that must converge for early stopping")
+    parser.add_argument('--rel-tol', type=float, default=None,
+                        help="stop once every 95%% CI half-width is below this fraction of its mean")
+    parser.add_argument('--min-runs', type=int, default=30)
+    parser.add_argument('--sample-every', type=int, default=100, help="ticks between ChemA samples")
+    parser.add_argument('--grid-size', type=int, default=GRID_SIZE, help="world width in cells")
+    parser.add_argument('--out', default='farm_results.json')
+    parser.add_argument('--maps', metavar='DIR', help="write each run's explored map as DIR/run_<seed>_map.png")
+    parser.add_argument('--heatmap', metavar='PATH', help="add every run's visit/seen counts to this heatmap file")
+    args = parser.parse_args()
+
+    report = farm(args.runs, args.ticks, args.out, workers=args.workers, seed=args.seed,
+                  metrics=args.metrics, rel_tol=args.rel_tol, min_runs=args.min_runs,
+                  sample_every=args.sample_every, maps_dir=args.maps, heatmap_path=args.heatmap,
+                  grid_size=args.grid_size)
+    print(f"{report['completed_runs']} runs{' (stopped early)' if report['stopped_early'] else ''} -> {args.out}")
+    for name, summary in report['summary'].items():
+        print(f"{name}: {summary['mean']:.3f} +/- {summary['ci95']:.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import numpy as np
+
+# Neighbour steps, in the order ties are broken
+STEPS = np.array([(0, -1), (1, 0), (0, 1), (-1, 0)])  # (dx, dy): up, right, down, left
+UNREACHABLE = -1
+
+def shifted(array, dx, dy, fill):
+    # out[y, x] = array[y + dy, x + dx], fill outside the grid
+    out = np.full_like(array, fill)
+    height, width = array.shape
+    out[max(0, -dy):height - max(0, dy), max(0, -dx):width - max(0, dx)] = \
+        array[max(0, dy):height - max(0, -dy), max(0, dx):width - max(0, -dx)]
+    return out
+
+def spread(open_cells, width, frontier, dist):
+    # Breadth-first over flat indices, one whole level per step: dist holds 0
+    # at the frontier cells and UNREACHABLE at the cells not reached yet, and
+    # is filled in place. Returns the flat indices reached, sources included.
+    size = len(open_cells)
+    slot = np.empty(size, dtype=np.intp)  # Drops duplicate candidates without sorting
+    reached = [frontier]
+    step = 0
+    while len(frontier):
+        step += 1
+        column = frontier % width
+        candidates = np.concatenate([
+            frontier[frontier >= width] - width,
+            frontier[column != width - 1] + 1,
+            frontier[frontier < size - width] + width,
+            frontier[column != 0] - 1,
+        ])
+        candidates = candidates[open_cells[candidates] & (dist[candidates] == UNREACHABLE)]
+        order = np.arange(len(candidates))
+        slot[candidates] = order
+        frontier = candidates[slot[candidates] == order]
+        dist[frontier] = step
+        reached.append(frontier)
+    return np.concatenate(reached)
+
+def bfs(passable, sources):
+    # Steps from every cell to the nearest source over passable cells;
+    # UNREACHABLE where no source can be reached
+    height, width = passable.shape
+    open_cells = passable.ravel()
+    dist = np.full(height * width, UNREACHABLE, dtype=np.int32)
+    starts = np.array([y * width + x for x, y in sources], dtype=np.intp)
+    starts = np.unique(starts[open_cells[starts]])
+    dist[starts] = 0
+    spread(open_cells, width, starts, dist)
+    return dist.reshape(height, width)
+
+def components(passable):
+    # Connected component id per passable cell (4-neighbourhood), 0 for
+    # walls. scipy.ndimage.label when scipy is installed, otherwise one
+    # level-at-a-time flood fill per component.
+    try:
+        from scipy import ndimage
+    except ImportError:
+        ndimage = None
+    if ndimage is not None:
+        labels, _ = ndimage.label(passable)
+        return labels.astype(np.int32)
+    height, width = passable.shape
+    open_cells = passable.ravel()
+    dist = np.where(open_cells, UNREACHABLE, 0).astype(np.int32)  # Walls count as reached
+    labels = np.zeros(height * width, dtype=np.int32)
+    unlabeled = open_cells.copy()
+    start = label = 0
+    while True:
+        start += int(np.argmax(unlabeled[start:]))  # Every cell before start is labeled already
+        if not unlabeled[start]:
+            break
+        label += 1
+        dist[start] = 0
+        cells = spread(open_cells, width, np.array([start]), dist)
+        labels[cells] = label
+        unlabeled[cells] = False
+    return labels.reshape(height, width)
+
+class FlowField:
+    # Distance to a set of target cells and, for every cell, the neighbour
+    # to step to next. Cells inside walls get a step too, so a cat that
+    # starts on one can walk out.
+    def __init__(self, passable, targets):
+        self.targets = targets
+        self.dist = bfs(passable, targets)
+        big = np.iinfo(np.int32).max
+        reachable = np.where(self.dist == UNREACHABLE, big, self.dist)
+        around = np.stack([shifted(reachable, dx, dy, big) for dx, dy in STEPS])
+        self.direction = np.argmin(around, axis=0).astype(np.int8)
+        self.direction[np.min(around, axis=0) == big] = UNREACHABLE
+
+    def distance(self, x, y):
+        return int(self.dist[y, x])
+
+    def touches(self, x, y):
+        # Whether (x, y) is a target or it or a neighbour is reachable: only
+        # then can a wall change there alter this field
+        if (x, y) in self.targets:
+            return True
+        height, width = self.dist.shape
+        for dx, dy in ((0, 0),) + tuple(map(tuple, STEPS.tolist())):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and self.dist[ny, nx] != UNREACHABLE:
+                return True
+        return False
+
+    def next_step(self, x, y):
+        # Neighbour one step closer to the nearest target, or None when there is none
+        if self.dist[y, x] == 0:
+            return None
+        d = self.direction[y, x]
+        if d == UNREACHABLE:
+            return None
+        dx, dy = STEPS[d]
+        return x + int(dx), y + int(dy)
+
+class FlowFields:
+    # Flow fields of one world, cached by target set, over world.passable
+    # (the grid the collision rules check). Component labels are built on
+    # first use; a field is computed once per distinct target set (e.g. the
+    # bushes still viable), so cycling through bush sets costs nothing after
+    # the first round. A wall change only drops the fields that reach it.
+    def __init__(self, world, max_fields=64):
+        self.world = world
+        self.max_fields = max_fields
+        self.fields = {}
+        self._labels = None
+
+    @property
+    def passable(self):
+        return self.world.passable
+
+    @property
+    def labels(self):
+        # Connected component id per passable cell, 0 for walls
+        if self._labels is None:
+            self._labels = components(self.passable)
+        return self._labels
+
+    def invalidate(self, x=None, y=None):
+        # The wall at (x, y) changed, or any walls when no cell is given
+        self._labels = None
+        if x is None:
+            self.fields.clear()
+            return
+        for key in [key for key, field in self.fields.items() if field.touches(x, y)]:
+            del self.fields[key]
+
+    def component(self, x, y):
+        # Component of (x, y); a wall cell belongs to the first open neighbour's
+        labels = self.labels
+        if labels[y, x]:
+            return int(labels[y, x])
+        for dx, dy in STEPS:
+            nx, ny = x + int(dx), y + int(dy)
+            if 0 <= nx < labels.shape[1] and 0 <= ny < labels.shape[0] and labels[ny, nx]:
+                return int(labels[ny, nx])
+        return 0
+
+    def reachable(self, x0, y0, x1, y1):
+        component = self.component(x0, y0)
+        return component != 0 and component == self.component(x1, y1)
+
+    def towards(self, targets):
+        # FlowField for an iterable of (x, y) targets
+        key = frozenset(targets)
+        field = self.fields.get(key)
+        if field is None:
+            if len(self.fields) >= self.max_fields:
+                self.fields.pop(next(iter(self.fields)))  # Oldest first
+            field = self.fields[key] = FlowField(self.passable, key)
+        return field
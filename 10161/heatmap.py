@@ -0,0 +1,154 @@
+import os
+import json
+import numpy as np
+from contextlib import contextmanager
+from catswarm import PHASES
+from look import zone_of_row, zone_count
+
+# Visit and seen counts per (phase, y, x), accumulated over any number of
+# runs and cats in one uint32 file on disk. Runs count into a private
+# HeatmapRecorder; the finished counts are added to the shared file in one
+# locked chunk, with the seeds they came from recorded in the header.
+
+CHANNELS = ['visits', 'seen']
+
+@contextmanager
+def file_lock(path):
+    # Exclusive lock on path, held for the with block: flock on POSIX,
+    # msvcrt on Windows, no locking where neither exists
+    with open(path, 'a') as f:
+        try:
+            import fcntl
+        except ImportError:
+            fcntl = None
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            return
+        try:
+            import msvcrt
+        except ImportError:
+            yield
+            return
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # Retries for 10 s, then raises OSError
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+class Heatmap:
+    def __init__(self, path, mode='r+'):
+        self.path = path
+        with open(path + '.json') as f:
+            header = json.load(f)
+        self.runs = header.get('runs', 0)  # Runs added so far, and their seeds
+        self.seeds = header.get('seeds', [])
+        self.grid_size = header['grid_size']
+        self.grid_height = header['grid_height']
+        self.phases = header['phases']
+        self.shape = (len(CHANNELS), len(self.phases), self.grid_height, self.grid_size)
+        self.counts = np.memmap(path, dtype=np.uint32, mode=mode, shape=self.shape)
+
+    @classmethod
+    def create(cls, path, grid_size, grid_height, exist_ok=True):
+        # New zeroed file plus a JSON header next to it; reuses an existing one
+        # if allowed. Under the same lock as add, so concurrent creators see
+        # either no file or a complete one.
+        with file_lock(path + '.lock'):
+            if os.path.exists(path):
+                if not exist_ok:
+                    raise FileExistsError(path)
+                return cls(path)
+            with open(path + '.json', 'w') as f:
+                json.dump({'grid_size': grid_size, 'grid_height': grid_height, 'phases': PHASES, 'runs': 0, 'seeds': []}, f)
+            shape = (len(CHANNELS), len(PHASES), grid_height, grid_size)
+            np.memmap(path, dtype=np.uint32, mode='w+', shape=shape).flush()
+            return cls(path)
+
+    def add(self, chunk, seeds=()):
+        # Add the counts of the runs with these seeds and record them in the
+        # header; an exclusive lock keeps concurrent writers apart
+        with file_lock(self.path + '.lock'):
+            self.counts += chunk
+            self.counts.flush()
+            with open(self.path + '.json') as f:
+                header = json.load(f)
+            header['seeds'] = header.get('seeds', []) + list(seeds)
+            header['runs'] = header.get('runs', 0) + len(seeds)
+            with open(self.path + '.json', 'w') as f:
+                json.dump(header, f)
+            self.runs, self.seeds = header['runs'], header['seeds']
+
+    def grid(self, channel='seen', phase=None):
+        # (height, width) counts for one channel, one phase or all of them
+        counts = self.counts[CHANNELS.index(channel)]
+        if phase is None:
+            return counts.sum(axis=0, dtype=np.uint64)
+        return np.asarray(counts[self.phases.index(phase)], dtype=np.uint64)
+
+    def marginal(self, channel='seen', phase=None, side=None, zone=None):
+        # grid() with everything outside the chosen side ('left'/'right') and
+        # zone (see look.zone_of_row) zeroed
+        grid = self.grid(channel, phase)
+        if side is not None:
+            half = self.grid_size // 2
+            if side == 'left':
+                grid[:, half:] = 0
+            else:
+                grid[:, :half] = 0
+        if zone is not None:
+            grid[zone_of_row(np.arange(self.grid_height), self.grid_height) != zone] = 0
+        return grid
+
+    def by_side(self, channel='seen', phase=None):
+        grid = self.grid(channel, phase)
+        half = self.grid_size // 2
+        return {'left': int(grid[:, :half].sum()), 'right': int(grid[:, half:].sum())}
+
+    def by_zone(self, channel='seen', phase=None):
+        # Totals per zone, top to bottom, with the same zones the cats use
+        grid = self.grid(channel, phase)
+        zones = zone_of_row(np.arange(self.grid_height), self.grid_height)
+        return np.bincount(zones, weights=grid.sum(axis=1), minlength=zone_count(self.grid_height)).astype(np.int64)
+
+    def by_phase(self, channel='seen'):
+        counts = self.counts[CHANNELS.index(channel)]
+        return {phase: int(counts[i].sum(dtype=np.uint64)) for i, phase in enumerate(self.phases)}
+
+class HeatmapRecorder:
+    # Observer of a Simulation or SwarmSimulation counting one run in memory;
+    # add it to a Heatmap with heatmap.add(recorder.counts, [seed]) at the end
+    def __init__(self, grid_size, grid_height):
+        self.counts = np.zeros((len(CHANNELS), len(PHASES), grid_height, grid_size), dtype=np.uint32)
+
+    def on_tick(self, sim):
+        swarm = getattr(sim, 'swarm', None)
+        if swarm is not None:
+            self.record_swarm(swarm)
+            return
+        cat = sim.cat
+        look = cat.look
+        phase = PHASES.index(look.phase)
+        self.counts[0, phase, cat.y, cat.x] += 1
+        y0, y1, x0, x1, mask = look.get_vision_window()
+        self.counts[1, phase, y0:y1, x0:x1] += mask
+
+    def record_swarm(self, swarm):
+        # Same counts for every cat of a CatSwarm, after its step
+        n = swarm.n
+        np.add.at(self.counts[0], (swarm.phase[:n], swarm.y[:n], swarm.x[:n]), 1)
+        world = swarm.world
+        stencil = np.where(swarm.stress_vision[:n], len(swarm.stencils) - 1, swarm.look_direction[:n])
+        for i in range(n):
+            oy, ox, mask = swarm.stencils[stencil[i]]
+            top, left = swarm.y[i] + oy, swarm.x[i] + ox
+            y0, x0 = max(0, top), max(0, left)
+            y1 = min(world.grid_height, top + mask.shape[0])
+            x1 = min(world.grid_size, left + mask.shape[1])
+            if y1 > y0 and x1 > x0:
+                self.counts[1, swarm.phase[i], y0:y1, x0:x1] += mask[y0 - top:y1 - top, x0 - left:x1 - left]
@@ -1,45 +1,10 @@
-import pygame
-import sqlite3
 import os
+import sqlite3
+from config import *
 
-# Initialize Pygame
-pygame.init()
-
-# Screen setup
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Proto-Cat Simulation")
-
-# Colors
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-RED = (255, 0, 0)
-GREEN = (0, 255, 0)
-BLUE = (0, 0, 255)
-
-# Grid settings
-GRID_SIZE = 64
-CELL_SIZE = min(SCREEN_WIDTH // GRID_SIZE, SCREEN_HEIGHT // GRID_SIZE)
-
-# Initialize SQLite database for logging
-conn = sqlite3.connect('proto_cat_logs.db')
-cursor = conn.cursor()
-
-# Create tables for logging if they don't exist
-cursor.execute('''
-    CREATE TABLE IF NOT EXISTS color_logs (
-        id INTEGER PRIMARY KEY,
-        timestamp TEXT,
-        object_type TEXT,
-        color TEXT
-    )
-''')
-conn.commit()
-
-# Ensure output directory exists for maps
-if not os.path.exists('cat_maps'):
-    os.makedirs('cat_maps')
+# Resources (window, log database and writer, output directory, ROS node) are opened on
+# first use inside a Resources context instead of at import, so the
+# simulation core and headless workers only pay for the constants.
 
 # Dummy ROS and OpenCV imports (to be replaced with actual imports later)
 class DummyROS:
@@ -54,13 +19,99 @@ class DummyOpenCV:
         print(f"Reading image from: {path}")
         self.image = "Dummy Image"
 
-ros = DummyROS()
-cv2 = DummyOpenCV()
+def map_dir(path=MAP_DIR):
+    # Ensure output directory exists for maps
+    os.makedirs(path, exist_ok=True)
+    return path
+
+class Resources:
+    def __init__(self, db_path=DB_PATH, map_path=MAP_DIR):
+        self.db_path = db_path
+        self.map_path = map_path
+        self._screen = None
+        self._clock = None
+        self._conn = None
+        self._color_log = None
+        self._ros = None
+        self._cv2 = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def display(self, size=(SCREEN_WIDTH, SCREEN_HEIGHT), caption="Proto-Cat Simulation"):
+        import pygame
+        if self._screen is None or self._screen.get_size() != tuple(size):
+            pygame.init()
+            self._screen = pygame.display.set_mode(size)
+        pygame.display.set_caption(caption)
+        return self._screen
+
+    @property
+    def screen(self):
+        return self._screen if self._screen is not None else self.display()
+
+    @property
+    def clock(self):
+        if self._clock is None:
+            import pygame
+            self._clock = pygame.time.Clock()
+        return self._clock
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            from colorlog import create_color_logs
+            self._conn = sqlite3.connect(self.db_path)
+            create_color_logs(self._conn)
+        return self._conn
+
+    def color_log(self, **options):
+        # Batched background writer for color_logs
+        if self._color_log is None:
+            from colorlog import ColorLog
+            self._color_log = ColorLog(self.db_path, **options)
+        return self._color_log
+
+    @property
+    def cursor(self):
+        return self.conn.cursor()
+
+    @property
+    def ros(self):
+        if self._ros is None:
+            self._ros = DummyROS()
+            self._ros.init_node('proto_cat_node')
+        return self._ros
+
+    @property
+    def cv2(self):
+        if self._cv2 is None:
+            self._cv2 = DummyOpenCV()
+        return self._cv2
+
+    def map_dir(self):
+        return map_dir(self.map_path)
 
-# Initialize dummy ROS node
-ros.init_node('proto_cat_node')
+    def close(self):
+        if self._color_log is not None:
+            self._color_log.close()
+            self._color_log = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._screen is not None:
+            import pygame
+            pygame.quit()
+            self._screen = None
+            self._clock = None
 
-# Global clock for the simulation
-clock = pygame.time.Clock()
+resources = Resources()
 
-# ... (other initialization code as needed)
\ No newline at end of file
+def __getattr__(name):
+    # Old module globals (init.screen, init.conn, ...) open on first access
+    if name in ('screen', 'clock', 'conn', 'cursor', 'ros', 'cv2'):
+        return getattr(resources, name)
+    raise AttributeError(f"module 'init' has no attribute {name!r}")
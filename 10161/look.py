@@ -1,6 +1,42 @@
-import time
-import pygame
-import math
+import numpy as np
+from perception import current_perception
+from common.events import log
+from common.profiler import profiler
+
+ZONES = 10  # Horizontal bands the phase transitions watch
+
+def zone_of_row(y, grid_height):
+    # Band of row y (an int or an array of rows), top to bottom. Rows below
+    # the last full band form one more, short band numbered ZONES.
+    return y // (grid_height // ZONES)
+
+def zone_count(grid_height):
+    return zone_of_row(grid_height - 1, grid_height) + 1
+
+def vision_stencil(spans):
+    # spans: list of ((dy_start, dy_end), (dx_start, dx_end)) inclusive offset ranges
+    # Returns the top-left offset of the bounding box and a boolean mask over it
+    oy = min(dy0 for (dy0, _), _ in spans)
+    ox = min(dx0 for _, (dx0, _) in spans)
+    height = max(dy1 for (_, dy1), _ in spans) - oy + 1
+    width = max(dx1 for _, (_, dx1) in spans) - ox + 1
+    mask = np.zeros((height, width), dtype=bool)
+    for (dy0, dy1), (dx0, dx1) in spans:
+        mask[dy0 - oy:dy1 - oy + 1, dx0 - ox:dx1 - ox + 1] = True
+    return oy, ox, mask
+
+def build_stencils(base_vision_size, chase_vision_size, forward_vision_length):
+    half = base_vision_size // 2
+    chase_half = chase_vision_size // 2
+    forward = forward_vision_length
+    square = ((-half, half), (-half, half))
+    return {
+        'stress': vision_stencil([((-chase_half, chase_half), (-chase_half, chase_half))]),
+        'left': vision_stencil([square, ((-half, half), (-forward, -1))]),
+        'right': vision_stencil([square, ((-half, half), (1, forward))]),
+        'up': vision_stencil([square, ((-forward, -1), (-half, half))]),
+        'down': vision_stencil([square, ((1, forward), (-half, half))]),
+    }
 
 class LookStrategy:
     def update(self, cat_look):
@@ -10,28 +46,49 @@ class LookStrategy:
         pass
 
 class TimedRotationStrategy(LookStrategy):
+    # Rotation times are scheduled on world.scheduler (simulated time); a
+    # rotation that falls due during stress vision happens once it ends
     def __init__(self, rotation_interval):
         self.rotation_interval = rotation_interval
-        self.last_rotation_time = time.time()
+        self.event = None
+        self.due = False
+
+    def schedule(self, cat_look):
+        self.due = False
+        self.event = cat_look.cat.world.scheduler.after(self.rotation_interval, self.set_due)
+
+    def set_due(self):
+        self.due = True
 
     def update(self, cat_look):
-        current_time = time.time()
-        if not cat_look.stress_vision and current_time - self.last_rotation_time >= self.rotation_interval:
+        if self.event is None:
+            self.schedule(cat_look)
+        if self.due and not cat_look.stress_vision:
             cat_look.rotate_look_direction()
-            self.last_rotation_time = current_time
+            self.schedule(cat_look)
 
 class PhaseBasedStrategy(LookStrategy):
-    def __init__(self):
-        self.last_bush_orientation_time = time.time()
+    def __init__(self, orientation_interval=5):
+        self.orientation_interval = orientation_interval
+        self.event = None
+        self.orientation_due = False
+
+    def schedule(self, cat_look):
+        self.orientation_due = False
+        self.event = cat_look.cat.world.scheduler.after(self.orientation_interval, self.set_due)
+
+    def set_due(self):
+        self.orientation_due = True
 
     def update(self, cat_look):
+        if self.event is None:
+            self.schedule(cat_look)
         if cat_look.stress_vision:
             return  # Don't change direction during hunting mode
 
-        current_time = time.time()
-        if current_time - self.last_bush_orientation_time >= 5:
+        if self.orientation_due:
             cat_look.orient_to_nearest_bush()
-            self.last_bush_orientation_time = current_time
+            self.schedule(cat_look)
 
         if cat_look.food_eaten > 0:
             cat_look.rotate_look_direction()
@@ -56,19 +113,36 @@ class CatLook:
         self.strategy = PhaseBasedStrategy()
         self.last_zone = None
         self.last_side = None
+        self.build_stencils()
+        self.vision_key = None
+        self.vision_window = None
+        self.vision_cells = None
+        self.overlays = {}  # (stencil, cell size) -> Surface, reused every frame
+
+    def build_stencils(self):
+        # Call again after changing any of the vision sizes
+        self.stencils = build_stencils(self.base_vision_size, self.chase_vision_size, self.forward_vision_length)
+        self.vision_key = None
+        self.overlays = {}
 
     def set_strategy(self, strategy):
+        if getattr(self.strategy, 'event', None) is not None:
+            self.strategy.event.cancel()
         self.strategy = strategy
 
     def update(self):
+        t = profiler.start()
         self.strategy.update(self)
-        self.check_for_food_or_rat()
+        # Reused by bush interaction and the mapper until the cat moves
+        self.check_for_food_or_rat(current_perception(self.cat))
+        profiler.stop('look.update', t)
         
         # Maintain stress vision while chasing a rat
         if self.cat.chasing and self.cat.chasing[2] == 'rat':
             self.stress_vision = True
         
-        print(f"Vision updated: phase={self.phase}, direction={self.look_direction}, stress={self.stress_vision}")
+        log.debug('vision_updated', tick=self.cat.world.tick, phase=self.phase,
+                  direction=self.look_direction, stress=self.stress_vision)
 
     def rotate_look_direction(self):
         directions = ['up', 'right', 'down', 'left']
@@ -84,94 +158,96 @@ class CatLook:
                 self.look_direction = 'right' if dx > 0 else 'left'
             else:
                 self.look_direction = 'down' if dy > 0 else 'up'
-            print(f"Oriented to nearest bush: {self.look_direction}")
+            log.debug('oriented_to_bush', tick=self.cat.world.tick, direction=self.look_direction)
 
     def find_nearest_viable_bush(self):
-        nearest_bush = None
-        min_distance = float('inf')
-        for y in range(self.cat.world.grid_height):
-            for x in range(self.cat.world.grid_size):
-                cell = self.cat.world.grid[y][x]
-                if isinstance(cell, tuple) and cell[0] == 'bush':
-                    bush_name = cell[1]
-                    if self.cat.bush_done[bush_name] < 4:
-                        distance = math.sqrt((x - self.cat.x)**2 + (y - self.cat.y)**2)
-                        if distance < min_distance:
-                            min_distance = distance
-                            nearest_bush = (x, y)
-        return nearest_bush
+        return self.cat.world.nearest('bush', self.cat.x, self.cat.y,
+                                      skip=lambda cell: self.cat.bush_done[cell[1]] >= 4)
+
+    def get_vision_window(self):
+        # Stress vision: 12x12 square centered on the cat
+        # Normal vision: 6x6 square with directional extension
+        # Returns (y0, y1, x0, x1, mask): the grid slice the vision covers, clipped,
+        # and which cells of that slice are seen. Shared by everyone in the same tick.
+        world = self.cat.world
+        key = (getattr(world, 'tick', 0), self.cat.x, self.cat.y, self.look_direction, self.stress_vision)
+        if key == self.vision_key:
+            return self.vision_window
+
+        oy, ox, mask = self.stencils['stress' if self.stress_vision else self.look_direction]
+        top, left = self.cat.y + oy, self.cat.x + ox
+        y0, x0 = max(0, top), max(0, left)
+        y1 = min(world.grid_height, top + mask.shape[0])
+        x1 = min(world.grid_size, left + mask.shape[1])
+        if y1 <= y0 or x1 <= x0:
+            y1, x1 = y0, x0
+        mask = mask[y0 - top:y1 - top, x0 - left:x1 - left]
+
+        self.vision_key = key
+        self.vision_window = (y0, y1, x0, x1, mask)
+        self.vision_cells = None
+        return self.vision_window
 
     def get_vision_range(self):
-        vision_range = set()
-        if self.stress_vision:
-            # Stress vision: 12x12 square centered on the cat
-            for dy in range(-self.chase_vision_size // 2, self.chase_vision_size // 2 + 1):
-                for dx in range(-self.chase_vision_size // 2, self.chase_vision_size // 2 + 1):
-                    vision_range.add((self.cat.y + dy, self.cat.x + dx))
-        else:
-            # Normal vision: 6x6 square with directional extension
-            for dy in range(-self.base_vision_size // 2, self.base_vision_size // 2 + 1):
-                for dx in range(-self.base_vision_size // 2, self.base_vision_size // 2 + 1):
-                    vision_range.add((self.cat.y + dy, self.cat.x + dx))
-            
-            # Extended vision based on look direction
-            if self.look_direction == 'left':
-                for dy in range(-self.base_vision_size // 2, self.base_vision_size // 2 + 1):
-                    for dx in range(-self.forward_vision_length, 0):
-                        vision_range.add((self.cat.y + dy, self.cat.x + dx))
-            elif self.look_direction == 'right':
-                for dy in range(-self.base_vision_size // 2, self.base_vision_size // 2 + 1):
-                    for dx in range(1, self.forward_vision_length + 1):
-                        vision_range.add((self.cat.y + dy, self.cat.x + dx))
-            elif self.look_direction == 'up':
-                for dy in range(-self.forward_vision_length, 0):
-                    for dx in range(-self.base_vision_size // 2, self.base_vision_size // 2 + 1):
-                        vision_range.add((self.cat.y + dy, self.cat.x + dx))
-            elif self.look_direction == 'down':
-                for dy in range(1, self.forward_vision_length + 1):
-                    for dx in range(-self.base_vision_size // 2, self.base_vision_size // 2 + 1):
-                        vision_range.add((self.cat.y + dy, self.cat.x + dx))
-        
-        return list(vision_range)
+        # List of (y, x) cells in view, clipped to the grid
+        y0, y1, x0, x1, mask = self.get_vision_window()
+        if self.vision_cells is None:
+            ys, xs = np.nonzero(mask)
+            self.vision_cells = list(zip((ys + y0).tolist(), (xs + x0).tolist()))
+        return self.vision_cells
+
+    def get_vision_overlay(self, CELL_SIZE):
+        # Translucent surface covering the current stencil's bounding box
+        import pygame  # Drawing only; the simulation core does not need pygame
+        stencil = 'stress' if self.stress_vision else self.look_direction
+        key = (stencil, CELL_SIZE)
+        if key not in self.overlays:
+            oy, ox, mask = self.stencils[stencil]
+            if self.stress_vision:
+                color = (255, 0, 0, 100)  # Red with alpha for stress vision
+            else:
+                color = (200, 200, 200, 100)  # Light gray with alpha for normal vision
+            surface = pygame.Surface((mask.shape[1] * CELL_SIZE, mask.shape[0] * CELL_SIZE), pygame.SRCALPHA)
+            for dy, dx in zip(*np.nonzero(mask)):
+                pygame.draw.rect(surface, color, (dx*CELL_SIZE, dy*CELL_SIZE, CELL_SIZE, CELL_SIZE))
+            self.overlays[key] = surface
+        return self.overlays[key]
 
     def draw_vision(self, screen, CELL_SIZE):
-        vision_range = self.get_vision_range()
-        vision_surface = pygame.Surface((self.cat.world.grid_size * CELL_SIZE, self.cat.world.grid_height * CELL_SIZE), pygame.SRCALPHA)
-        
-        if self.stress_vision:
-            color = (255, 0, 0, 100)  # Red with alpha for stress vision
-        else:
-            color = (200, 200, 200, 100)  # Light gray with alpha for normal vision
-        
-        for y, x in vision_range:
-            if 0 <= x < self.cat.world.grid_size and 0 <= y < self.cat.world.grid_height:
-                pygame.draw.rect(vision_surface, color, (x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE))
-        
-        screen.blit(vision_surface, (0, 0))
-
-    def check_for_food_or_rat(self):
-        vision_range = self.get_vision_range()
-        for y, x in vision_range:
-            if 0 <= x < self.cat.world.grid_size and 0 <= y < self.cat.world.grid_height:
-                cell = self.cat.world.grid[y][x]
-                if isinstance(cell, tuple) and cell[0] in ['food', 'rat']:
-                    self.cat.chasing = (x, y, cell[0])
-                    if cell[0] == 'rat':
-                        self.cat.chem_manager.get_pool('ChemA').add(5)  # STRESS^^^^
-                        self.stress_vision = True
-                        print(f"Stress vision activated: {self.stress_vision}")  # Debug print
-                    else:
-                        self.cat.chem_manager.get_pool('ChemA').add(1)  # STRESS^
-                    self.strategy.on_food_eaten(self)
-                    return True
+        # Returns the screen rect that was drawn over
+        import pygame
+        oy, ox, _ = self.stencils['stress' if self.stress_vision else self.look_direction]
+        y0, y1, x0, x1, _ = self.get_vision_window()
+        top, left = self.cat.y + oy, self.cat.x + ox
+        area = pygame.Rect((x0 - left) * CELL_SIZE, (y0 - top) * CELL_SIZE, (x1 - x0) * CELL_SIZE, (y1 - y0) * CELL_SIZE)
+        return screen.blit(self.get_vision_overlay(CELL_SIZE), (x0 * CELL_SIZE, y0 * CELL_SIZE), area)
+
+    def check_for_food_or_rat(self, perception=None):
+        if perception is None:
+            perception = current_perception(self.cat)
+        if perception.target and self.is_reachable(perception.target):
+            self.cat.chasing = perception.target
+            target_type = perception.target[2]
+            if target_type == 'rat':
+                self.cat.chem_a.add(5)  # STRESS^^^^
+                self.stress_vision = True
+                log.info('stress_vision', tick=self.cat.world.tick, active=True)
+            else:
+                self.cat.chem_a.add(1)  # STRESS^
+            self.strategy.on_food_eaten(self)
+            return True
         
         # If no food or rat found, and cat was previously chasing, reset stress vision
         if self.cat.chasing is None and self.stress_vision:
             self.stress_vision = False
-            print(f"Stress vision deactivated: {self.stress_vision}")  # Debug print
+            log.info('stress_vision', tick=self.cat.world.tick, active=False)
         
         return False
 
+    def is_reachable(self, target):
+        # Targets behind a wall with no way round are not worth a chase
+        return self.cat.world.flow.reachable(self.cat.x, self.cat.y, target[0], target[1])
+
     def update_phase(self, target_type):
         if target_type in ['food', 'rat']:
             if self.phase == '1a':
@@ -186,10 +262,11 @@ class CatLook:
         if target_type == 'rat':
             self.stress_vision = False
         
-        print(f"Phase updated to {self.phase}, target_type: {target_type}, position: ({self.cat.x}, {self.cat.y})")
+        log.info('phase_updated', tick=self.cat.world.tick, phase=self.phase, target=target_type,
+                 x=self.cat.x, y=self.cat.y)
 
     def check_phase_transition(self):
-        current_zone = self.cat.y // (self.cat.world.grid_height // 10)
+        current_zone = zone_of_row(self.cat.y, self.cat.world.grid_height)
         current_side = 'left' if self.cat.x < self.cat.world.grid_size // 2 else 'right'
 
         if self.phase == '1b':
@@ -197,7 +274,7 @@ class CatLook:
                (self.last_side is not None and current_side != self.last_side):
                 self.phase = '2'
                 self.rotate_look_direction()
-                print(f"Transitioned to phase 2 at position: ({self.cat.x}, {self.cat.y})")
+                log.info('phase_transition', tick=self.cat.world.tick, phase=self.phase, x=self.cat.x, y=self.cat.y)
 
         self.last_zone = current_zone
         self.last_side = current_side
\ No newline at end of file
@@ -1,64 +1,77 @@
-import pygame
 import random
-from init import WHITE, CELL_SIZE, GRID_SIZE
-from world import World
-from cat import Cat, CatMapper
-from chem_manager import ChemManager
-from look import TimedRotationStrategy, PhaseBasedStrategy
-from catbush import CatBush
-from walkchase import CatWalkChase
+import argparse
+from common.events import configure, LEVEL_NAMES
+from common.profiler import profiler
+from config import CELL_SIZE, GRID_SIZE
+from init import Resources
+from simulation import Simulation
+from replay import ReplayLog, WallClock, ReplayClock
 
 def main():
-    pygame.init()
-    screen = pygame.display.set_mode((GRID_SIZE * CELL_SIZE, int(GRID_SIZE * 1.3 * CELL_SIZE)))
-    pygame.display.set_caption("Cat Simulation")
-    clock = pygame.time.Clock()
-    running = True
+    parser = argparse.ArgumentParser(description="Cat Simulation")
+    parser.add_argument('--headless', action='store_true', help="run as fast as the CPU allows, no window")
+    parser.add_argument('--ticks', type=int, default=100_000, help="ticks to run headless")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--record', metavar='PATH', help="save a replay log of the windowed run")
+    parser.add_argument('--replay', metavar='PATH', help="re-run a recorded run headless")
+    parser.add_argument('--log', metavar='PATH', help="write events to a JSONL file")
+    parser.add_argument('--log-level', choices=list(LEVEL_NAMES.values()), default='info')
+    parser.add_argument('--color-log', action='store_true', help="log seen bush colors to the color_logs table")
+    parser.add_argument('--profile', type=int, metavar='TICKS', nargs='?', const=0, default=None,
+                        help="time each tick phase; print a summary every TICKS ticks and at the end")
+    parser.add_argument('--profile-dump', metavar='PATH', help="write the profile as JSON at the end")
+    args = parser.parse_args()
 
-    world = World()
-    chem_manager = ChemManager()
-    cat = Cat(world.grid_size // 2, world.grid_height - 1, world, chem_manager)
-    cat_mapper = CatMapper(world.grid_size, world.grid_height)
+    levels = {name: level for level, name in LEVEL_NAMES.items()}
+    configure(levels[args.log_level], args.log)
+    if args.profile is not None or args.profile_dump:
+        profiler.report_every = args.profile or None
+        profiler.set_enabled(True)
+    try:
+        run(args)
+    finally:
+        if profiler.enabled:
+            print(profiler.format())
+            if args.profile_dump:
+                profiler.dump(args.profile_dump)
 
-    # Initialize CatBush and CatWalkChase separately
-    cat.bush = CatBush(cat, world, chem_manager)
-    cat.policies = CatWalkChase(cat, world, chem_manager)
-    
-    cat.initialize_bush_done() 
+def run(args):
+    if args.replay:
+        log = ReplayLog.load(args.replay)
+        sim = Simulation(log.seed, clock=ReplayClock(log), **log.config)
+        print(sim.run(ticks=len(log)))
+        return
 
-    # Uncomment the next line to use timed rotation instead of phase-based
-    # cat.look.set_strategy(TimedRotationStrategy(10))
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+    config = {'bush_seek_chance': 0.7}
 
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+    if args.headless:
+        # Simulated clock, so the seed alone reproduces the run
+        sim = Simulation(seed, **config)
+        with Resources() as resources:
+            if args.color_log:
+                sim.attach(resources.color_log())
+            print(sim.run(ticks=args.ticks))
+        return
 
-        screen.fill(WHITE)
+    from render import PygameView  # Pulls in pygame, so only for the window
+    log = ReplayLog(seed, config)
+    sim = Simulation(seed, clock=WallClock(log), **config)
 
-        world.update_rats()
-        world.remove_dead_rats()
-        world.draw(screen, CELL_SIZE)
+    # Uncomment the next lines to use timed rotation instead of phase-based
+    # from look import TimedRotationStrategy
+    # sim.cat.look.set_strategy(TimedRotationStrategy(10))
 
-        cat.update()
+    with Resources() as resources:
+        screen = resources.display((GRID_SIZE * CELL_SIZE, int(GRID_SIZE * 1.3 * CELL_SIZE)), "Cat Simulation")
+        if args.color_log:
+            sim.attach(resources.color_log())
+        sim.attach(PygameView(screen, CELL_SIZE, fps=5))  # 5 FPS for slower simulation
+        sim.run()
 
-        if cat.chasing:
-            cat.policies.chase_target()
-        else:
-            if random.random() < 0.7:  # 70% chance to seek a bush
-                cat.bush.move_towards_bush()
-            else:
-                cat.policies.random_walk()
-
-        cat.draw(screen, CELL_SIZE)
-        cat.look.draw_vision(screen, CELL_SIZE)
-
-        cat_mapper.update(cat, world)
-
-        pygame.display.flip()
-        clock.tick(5)  # 5 FPS for slower simulation
-
-    pygame.quit()
+    if args.record:
+        log.save(args.record)
+        print(f"Replay log ({len(log)} ticks, seed {seed}) saved to {args.record}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,27 @@
+import zlib
+import struct
+import numpy as np
+
+# PNG writer for bit maps, straight from np.packbits rows: a 1-bit grayscale
+# PNG stores each row as packed bits, most significant bit first, which is
+# exactly what packbits produces.
+
+def chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+def write_bitmap_png(path, packed, width, scale=1, invert=True):
+    # packed: (height, ceil(width / 8)) uint8 rows; invert makes set bits black
+    if scale > 1:
+        bits = np.unpackbits(packed, axis=1, count=width)
+        bits = np.repeat(np.repeat(bits, scale, axis=0), scale, axis=1)
+        packed, width = np.packbits(bits, axis=1), width * scale
+    if invert:
+        packed = ~packed
+    height = packed.shape[0]
+    rows = np.zeros((height, packed.shape[1] + 1), dtype=np.uint8)  # Filter byte 0 (none) per row
+    rows[:, 1:] = packed
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 1, 0, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(rows.tobytes(), 6)))
+        f.write(chunk(b'IEND', b''))
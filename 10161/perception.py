@@ -0,0 +1,79 @@
+import numpy as np
+from world import EMPTY, BUSH, FOOD, RAT, KIND_NAMES
+from common.profiler import profiler
+
+class Perception:
+    # One copy of the grid around the cat, read once. The target is found
+    # straight away; bush and seen are worked out from the same copy the
+    # first time somebody asks for them.
+    def __init__(self, world, x, y, kinds, origin, vision_window, near_radius):
+        self.world = world
+        self.tick = world.tick
+        self.x = x
+        self.y = y
+        self.kinds = kinds
+        self.origin = origin  # (y0, x0) of kinds in grid coordinates
+        self.vision_window = vision_window
+        self.near_radius = near_radius
+        self.target = None  # (x, y, 'food'/'rat') first hit in the vision range
+        self._bush = False
+        self._seen = None
+
+    def view(self, y0, y1, x0, x1):
+        oy, ox = self.origin
+        return self.kinds[y0 - oy:y1 - oy, x0 - ox:x1 - ox]
+
+    @property
+    def bush(self):
+        # (x, y, bush_name) of the first bush cell within the interaction radius, or None
+        if self._bush is False:
+            self._bush = None
+            y0, y1, x0, x1 = self.world.window(self.x, self.y, self.near_radius)
+            if self.world.count(BUSH, y0, y1, x0, x1):
+                hits = self.world.kind[y0:y1, x0:x1] == BUSH  # Object layer: a rat on a bush doesn't hide it
+                dy, dx = np.argwhere(hits)[0]  # First bush cell in row order
+                bush_x, bush_y = x0 + int(dx), y0 + int(dy)
+                self._bush = (bush_x, bush_y, self.world.names[self.world.entity[bush_y, bush_x]])
+        return self._bush
+
+    @property
+    def seen(self):
+        # (y0, y1, x0, x1, mask) of non-empty cells in view, for CatMapper
+        if self._seen is None:
+            y0, y1, x0, x1, mask = self.vision_window
+            self._seen = (y0, y1, x0, x1, mask & (self.view(y0, y1, x0, x1) != EMPTY))
+        return self._seen
+
+def perceive(cat):
+    # One read of the grid around the cat, shared by look, bush and mapper
+    world = cat.world
+    vision_window = cat.look.get_vision_window()
+    vy0, vy1, vx0, vx1, vision_mask = vision_window
+    near_radius = cat.bush_interaction_radius
+    ny0, ny1, nx0, nx1 = world.window(cat.x, cat.y, near_radius)
+    y0, y1 = min(vy0, ny0), max(vy1, ny1)
+    x0, x1 = min(vx0, nx0), max(vx1, nx1)
+
+    perception = Perception(world, cat.x, cat.y, world.kinds(y0, y1, x0, x1), (y0, x0),
+                            vision_window, near_radius)
+    profiler.count('cells.perception', (y1 - y0) * (x1 - x0))
+
+    # Nothing to look for unless the vision's bounding box has food or a rat in it
+    if not (world.count(FOOD, vy0, vy1, vx0, vx1) or world.count(RAT, vy0, vy1, vx0, vx1)):
+        return perception
+    vision = perception.view(vy0, vy1, vx0, vx1)
+    hits = vision_mask & ((vision == FOOD) | (vision == RAT))
+    if hits.any():
+        dy, dx = np.argwhere(hits)[0]
+        perception.target = (vx0 + int(dx), vy0 + int(dy), KIND_NAMES[vision[dy, dx]])
+    return perception
+
+def current_perception(cat):
+    # The cat's perception of where it stands now: the cached one only if the
+    # tick, position and vision window all still match, else a fresh pass
+    perception = cat.perception
+    if (perception is None or perception.tick != cat.world.tick
+            or perception.x != cat.x or perception.y != cat.y
+            or perception.vision_window is not cat.look.get_vision_window()):
+        perception = cat.perception = perceive(cat)
+    return perception
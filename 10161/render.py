@@ -0,0 +1,89 @@
+import pygame
+import numpy as np
+from config import WHITE
+from world import SEPARATOR, BRIDGE, BUSH, FOOD, RAT
+from common.profiler import profiler
+
+STATIC_KINDS = (SEPARATOR, BRIDGE, BUSH)
+DYNAMIC_KINDS = (FOOD, RAT)
+
+class PygameView:
+    # Keeps the background and terrain (separator, bridge, bushes) in one
+    # cached surface and only redraws the cells that changed since the last
+    # frame, plus the areas the cat and its vision overlay covered.
+    def __init__(self, screen, cell_size, fps=5):
+        self.screen = screen
+        self.cell_size = cell_size
+        self.fps = fps  # None draws as fast as the simulation steps
+        self.clock = pygame.time.Clock()
+        self.static = None
+        self.last_rects = []
+
+    def cell_rect(self, x, y):
+        return pygame.Rect(x * self.cell_size, y * self.cell_size, self.cell_size, self.cell_size)
+
+    def paint_static_cell(self, world, x, y):
+        kind = world.kind[y, x]
+        color = world.object_color(x, y) if kind in STATIC_KINDS else world.background_color(x)
+        pygame.draw.rect(self.static, color, self.cell_rect(x, y))
+
+    def build_static(self, world):
+        self.static = pygame.Surface(self.screen.get_size())
+        self.static.fill(WHITE)
+        size = self.cell_size
+        pygame.draw.rect(self.static, world.background_color(0), (0, 0, world.grid_size * size // 2, world.grid_height * size))
+        pygame.draw.rect(self.static, world.background_color(world.grid_size - 1),
+                         (world.grid_size * size // 2, 0, world.grid_size * size // 2, world.grid_height * size))
+        for y, x in np.argwhere(np.isin(world.kind, STATIC_KINDS)):
+            self.paint_static_cell(world, x, y)
+        world.changed = set()
+
+    def restore(self, world, rect):
+        # Put back the cached terrain under rect and redraw food and rats in it
+        self.screen.blit(self.static, rect, rect)
+        size = self.cell_size
+        x0, y0 = max(0, rect.left // size), max(0, rect.top // size)
+        x1 = min(world.grid_size, -(-rect.right // size))
+        y1 = min(world.grid_height, -(-rect.bottom // size))
+        window = world.kinds(y0, y1, x0, x1)
+        profiler.count('cells.render', window.size)
+        for dy, dx in np.argwhere(np.isin(window, DYNAMIC_KINDS)):
+            pygame.draw.rect(self.screen, world.cell_color(x0 + dx, y0 + dy), self.cell_rect(x0 + dx, y0 + dy))
+
+    def draw(self, sim):
+        world = sim.world
+        if self.static is None:
+            self.build_static(world)
+            self.screen.blit(self.static, (0, 0))
+            self.restore(world, self.screen.get_rect())
+            self.last_rects = [sim.cat.draw(self.screen, self.cell_size),
+                               sim.cat.look.draw_vision(self.screen, self.cell_size)]
+            pygame.display.flip()
+            return
+
+        t = profiler.start()
+        dirty = self.last_rects
+        for x, y in world.changed:
+            self.paint_static_cell(world, x, y)
+            dirty.append(self.cell_rect(x, y))
+        world.changed.clear()
+        for rect in dirty:
+            self.restore(world, rect)
+        profiler.stop('render.world', t)
+
+        t = profiler.start()
+        self.last_rects = [sim.cat.draw(self.screen, self.cell_size),
+                           sim.cat.look.draw_vision(self.screen, self.cell_size)]
+        profiler.stop('render.draw_vision', t)
+        t = profiler.start()
+        pygame.display.update(dirty + self.last_rects)
+        profiler.stop('render.flip', t)
+
+    def on_tick(self, sim):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                sim.running = False
+
+        self.draw(sim)
+        if self.fps:
+            self.clock.tick(self.fps)
@@ -0,0 +1,90 @@
+import json
+import time
+import zlib
+from array import array
+
+# Clocks are read by the look strategies through world.clock. Time only
+# moves when the simulation loop calls advance(), once per tick, so every
+# reading in a tick is the same and can be logged and replayed exactly.
+
+class SimClock:
+    # Simulated seconds, a fixed step per tick (0.2 s = the old 5 FPS)
+    def __init__(self, tick_seconds=0.2):
+        self.tick_seconds = tick_seconds
+        self.ticks = 0
+        self.time = 0.0
+
+    def now(self):
+        return self.time
+
+    def advance(self):
+        self.ticks += 1
+        self.time = self.ticks * self.tick_seconds
+
+class WallClock:
+    # Real elapsed time, whole microseconds, optionally recorded into a ReplayLog
+    def __init__(self, log=None):
+        self.log = log
+        self.start = time.perf_counter()
+        self.time = 0.0
+
+    def now(self):
+        return self.time
+
+    def advance(self):
+        micros = int((time.perf_counter() - self.start) * 1_000_000)
+        self.time = micros / 1_000_000
+        if self.log is not None:
+            self.log.record(micros)
+
+class ReplayClock:
+    # Feeds back the readings of a recorded WallClock, one per tick
+    def __init__(self, log):
+        self.values = log.values()
+        self.index = 0
+        self.time = 0.0
+
+    def now(self):
+        return self.time
+
+    def advance(self):
+        self.time = self.values[self.index] / 1_000_000
+        self.index += 1
+
+class ReplayLog:
+    # Seed, config and one clock reading per tick, delta encoded and zlib
+    # compressed. With the seeded RNG this is everything a run depends on.
+    def __init__(self, seed, config=None):
+        self.seed = seed
+        self.config = config or {}
+        self.deltas = array('q')
+        self.last = 0
+
+    def record(self, value):
+        self.deltas.append(value - self.last)
+        self.last = value
+
+    def values(self):
+        values, total = [], 0
+        for delta in self.deltas:
+            total += delta
+            values.append(total)
+        return values
+
+    def __len__(self):
+        return len(self.deltas)
+
+    def save(self, path):
+        header = json.dumps({'seed': self.seed, 'config': self.config, 'ticks': len(self.deltas)})
+        with open(path, 'wb') as f:
+            f.write(header.encode() + b'\n')
+            f.write(zlib.compress(self.deltas.tobytes()))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+            log = cls(header['seed'], header['config'])
+            log.deltas.frombytes(zlib.decompress(f.read()))
+        log.last = sum(log.deltas)
+        return log
@@ -0,0 +1,58 @@
+import heapq
+import itertools
+
+class Event:
+    __slots__ = ('time', 'callback', 'args', 'cancelled')
+
+    def __init__(self, time, callback, args):
+        self.time = time
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class Scheduler:
+    # Future actions on the world clock, kept in a heap. run_due() is called
+    # once per tick after the clock advances and runs everything whose time
+    # has come, in time order (ties in the order they were scheduled), so
+    # nothing has to be polled before it is due.
+    def __init__(self, clock):
+        self.clock = clock
+        self.queue = []
+        self.counter = itertools.count()
+
+    def at(self, time, callback, *args):
+        event = Event(time, callback, args)
+        heapq.heappush(self.queue, (time, next(self.counter), event))
+        return event
+
+    def after(self, delay, callback, *args):
+        return self.at(self.clock.now() + delay, callback, *args)
+
+    def every(self, interval, callback, *args):
+        # callback(*args) every interval from now on; returns a handle whose cancel() stops it
+        handle = Event(None, callback, args)
+        def repeat():
+            if not handle.cancelled:
+                callback(*args)
+                handle.time = self.after(interval, repeat).time
+        handle.time = self.after(interval, repeat).time
+        return handle
+
+    def next_time(self):
+        while self.queue and self.queue[0][2].cancelled:
+            heapq.heappop(self.queue)
+        return self.queue[0][0] if self.queue else None
+
+    def run_due(self):
+        now = self.clock.now()
+        queue = self.queue
+        while queue and queue[0][0] <= now:
+            _, _, event = heapq.heappop(queue)
+            if not event.cancelled:
+                event.callback(*event.args)
+
+    def __len__(self):
+        return sum(1 for _, _, event in self.queue if not event.cancelled)
@@ -0,0 +1,172 @@
+import random
+import time
+import numpy as np
+from world import World
+from cat import Cat, CatMapper
+from chem_manager import ChemManager
+from catbush import CatBush
+from walkchase import CatWalkChase
+from catswarm import CatSwarm, PHASES
+from replay import SimClock
+from common.profiler import profiler
+from ecs import Systems
+from config import GRID_SIZE
+
+class Simulation:
+    def __init__(self, seed=None, clock=None, bush_seek_chance=0.7, rat_interval=None, bush_reset_delay=0,
+                 chem_decay=None, chem_couplings=(), grid_size=GRID_SIZE):
+        # Same seed and clock readings give the same run, see replay.py.
+        # rat_interval (simulated seconds) moves the rats on the scheduler
+        # instead of every tick; bush_reset_delay postpones the bush reset.
+        # chem_decay and chem_couplings set the pool kinetics, see ChemManager.
+        # grid_size is the world width, the height follows from it.
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.clock = clock or SimClock()
+        self.world = World(grid_size=grid_size, rng=self.rng, clock=self.clock)
+        self.chem_manager = ChemManager(decay=chem_decay, couplings=chem_couplings)
+        self.cat = Cat(self.world.grid_size // 2, self.world.grid_height - 1, self.world, self.chem_manager)
+        self.cat_mapper = CatMapper(self.world.grid_size, self.world.grid_height)
+
+        self.cat.bush = CatBush(self.cat, self.world, self.chem_manager, reset_delay=bush_reset_delay)
+        self.cat.policies = CatWalkChase(self.cat, self.world, self.chem_manager)
+        self.cat.initialize_bush_done()
+
+        self.bush_seek_chance = bush_seek_chance
+        self.rat_interval = rat_interval
+        if rat_interval:
+            self.world.scheduler.every(rat_interval, self.world.update_rats)
+        self.initial_rats = len(self.world.rats)
+        self.observers = []  # Renderers etc, called once per tick
+        self.tick = 0
+        self.running = True
+
+        # Per-tick phases, in order. The single cat is still the Cat/CatLook
+        # object graph, so these are its methods run and timed by name, not
+        # systems over table columns; CatSwarm is the table-based version.
+        self.systems = Systems()
+        self.systems.add('scheduler', self.world.scheduler.run_due)
+        self.systems.add('world.update_rats', self.move_rats)
+        self.systems.add('cat.update', self.cat.update)
+        self.systems.add('policies', self.move_cat)
+        self.systems.add('chemistry', self.chem_manager.update_pools)
+        self.systems.add('cat_mapper.update', self.update_map)
+
+    def attach(self, observer):
+        self.observers.append(observer)
+
+    def detach(self, observer):
+        self.observers.remove(observer)
+
+    def move_rats(self):
+        if not self.rat_interval:
+            self.world.update_rats()
+        self.world.remove_dead_rats()
+
+    def move_cat(self):
+        cat = self.cat
+        if cat.chasing:
+            cat.policies.chase_target()
+        else:
+            if self.rng.random() < self.bush_seek_chance:
+                cat.bush.move_towards_bush()
+            else:
+                cat.policies.random_walk()
+
+    def update_map(self):
+        self.cat_mapper.update(self.cat, self.world)
+
+    def step(self):
+        self.world.tick = self.tick
+        self.clock.advance()
+        self.systems.run()
+        self.tick += 1
+
+        t = profiler.start()
+        for observer in self.observers:
+            observer.on_tick(self)
+        profiler.stop('observers', t)
+        profiler.tick()
+
+    def run(self, ticks=None):
+        # ticks=None runs until an observer (e.g. the window) stops the simulation
+        start = time.perf_counter()
+        start_tick = self.tick
+        while self.running and (ticks is None or self.tick - start_tick < ticks):
+            self.step()
+        elapsed = time.perf_counter() - start
+        return self.metrics(self.tick - start_tick, elapsed)
+
+    def metrics(self, ticks=0, elapsed=0.0):
+        return {
+            'ticks': ticks,
+            'elapsed': elapsed,
+            'ticks_per_second': ticks / elapsed if elapsed > 0 else 0.0,
+            'cat_position': (self.cat.x, self.cat.y),
+            'phase': self.cat.look.phase,
+            'chem_a': self.cat.chem_a.value,
+            'bush_done': dict(self.cat.bush_done),
+            'bushes_completed': self.cat.bushes_completed,
+            'rats_alive': len(self.world.rats),
+            'rats_eaten': self.initial_rats - len(self.world.rats),
+        }
+
+class SwarmSimulation:
+    # Population runs: many cats sharing one World, stepped together by CatSwarm
+    def __init__(self, n_cats, seed=None, bush_seek_chance=0.7, world=None, grid_size=GRID_SIZE):
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.world = world or World(grid_size=grid_size, rng=random.Random(self.seed))
+        self.swarm = CatSwarm(self.world, n_cats, rng=np.random.default_rng(self.seed),
+                              bush_seek_chance=bush_seek_chance)
+        self.initial_rats = len(self.world.rats)
+        self.observers = []
+        self.tick = 0
+        self.running = True
+
+    def attach(self, observer):
+        self.observers.append(observer)
+
+    def detach(self, observer):
+        self.observers.remove(observer)
+
+    def step(self):
+        self.world.tick = self.tick
+        self.world.clock.advance()
+        self.world.scheduler.run_due()
+        t = profiler.start()
+        self.world.update_rats()
+        self.world.remove_dead_rats()
+        profiler.stop('world.update_rats', t)
+        t = profiler.start()
+        self.swarm.step(self.tick)
+        profiler.stop('swarm.step', t)
+        self.tick += 1
+
+        t = profiler.start()
+        for observer in self.observers:
+            observer.on_tick(self)
+        profiler.stop('observers', t)
+        profiler.tick()
+
+    def run(self, ticks=None):
+        start = time.perf_counter()
+        start_tick = self.tick
+        while self.running and (ticks is None or self.tick - start_tick < ticks):
+            self.step()
+        elapsed = time.perf_counter() - start
+        return self.metrics(self.tick - start_tick, elapsed)
+
+    def metrics(self, ticks=0, elapsed=0.0):
+        swarm = self.swarm
+        return {
+            'ticks': ticks,
+            'elapsed': elapsed,
+            'ticks_per_second': ticks / elapsed if elapsed > 0 else 0.0,
+            'cats': swarm.n,
+            'phases': {phase: int(count) for phase, count in zip(PHASES, np.bincount(swarm.phase, minlength=len(PHASES)))},
+            'chem_a_mean': float(swarm.chem_a.mean()) if swarm.n else 0.0,
+            'bush_visits': dict(zip(swarm.bush_names, swarm.bush_visits.sum(axis=0).tolist())),
+            'bushes_completed': int(swarm.bushes_completed.sum()),
+            'rats_alive': len(self.world.rats),
+            'rats_eaten': self.initial_rats - len(self.world.rats),
+        }
@@ -0,0 +1,34 @@
+import zlib
+import struct
+import numpy as np
+from cat import CatMapper
+from simulation import Simulation
+from farm import save_outputs
+
+def read_bitmap_png(path):
+    # (width, height, bits) of a 1-bit grayscale PNG written by mapimage
+    with open(path, 'rb') as f:
+        data = f.read()
+    width, height = struct.unpack('>II', data[16:24])
+    idat_length = struct.unpack('>I', data[33:37])[0]
+    rows = np.frombuffer(zlib.decompress(data[41:41 + idat_length]), dtype=np.uint8).reshape(height, -1)
+    return width, height, np.unpackbits(rows[:, 1:], axis=1, count=width)
+
+def test_coverage_counts_the_explored_bits():
+    sim = Simulation(seed=3)
+    sim.run(ticks=300)
+    mapper = sim.cat_mapper
+    assert mapper.explored == mapper.map.sum()
+    assert mapper.coverage() == mapper.map.sum() / (mapper.grid_size * mapper.grid_height)
+
+def test_saved_map_has_the_grid_width(tmp_path):
+    mapper = CatMapper(13, 5)
+    bits = np.random.default_rng(0).random((5, 13)) < 0.5
+    mapper.packed[:] = np.packbits(bits, axis=1)
+    result = {'seed': 7, 'map': mapper.packed, 'map_width': mapper.grid_size, 'heatmap_counts': None}
+    save_outputs(result, str(tmp_path), None)
+    width, height, pixels = read_bitmap_png(tmp_path / 'run_7_map.png')
+    assert (width, height) == (13 * 8, 5 * 8)
+    expected = np.repeat(np.repeat(bits, 8, axis=0), 8, axis=1)
+    assert np.array_equal(pixels, ~expected & 1)  # Explored cells are black
+    assert 'map_width' not in result
@@ -0,0 +1,43 @@
+import numpy as np
+from chemstore import ChemStore
+from chem_manager import ChemManager
+
+def test_row_survives_register():
+    store = ChemStore(['ChemA'], agents=3)
+    chem_a = store.row('ChemA')
+    store.register('ChemB')
+    chem_a[1] += 2
+    assert store.pool('ChemA', agent=1).value == 2
+    assert np.array_equal(store.values[store.rows['ChemA']], chem_a)
+
+def test_pool_survives_growth():
+    store = ChemStore(['ChemA'], capacity=1)
+    pool = store.pool('ChemA')
+    store.register('ChemB')
+    pool.add(3)
+    assert store.values[store.rows['ChemA'], 0] == 3
+
+def test_growth_with_rows_in_use_raises():
+    store = ChemStore(['ChemA'], capacity=1)
+    store.row('ChemA')
+    try:
+        store.register('ChemB')
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("register moved rows that are in use")
+
+def test_step_decay_and_coupling():
+    store = ChemStore(['ChemA', 'ChemB'], agents=2)
+    store.row('ChemA')[:] = 10
+    store.couple('ChemA', 'ChemB', 0.5)
+    store.set_decay('ChemB', 0.5)
+    store.step()
+    assert np.allclose(store.values, [[5, 5], [2.5, 2.5]])
+
+def test_manager_configures_kinetics():
+    manager = ChemManager(decay={'ChemA': 0.5}, couplings=[('ChemA', 'BushDoneA', 0.5)])
+    manager.get_pool('ChemA').add(8)
+    manager.update_pools()
+    assert manager.get_pool('ChemA').value == 2
+    assert manager.get_pool('BushDoneA').value == 4
@@ -0,0 +1,33 @@
+import random
+import numpy as np
+from world import World
+from collision import CollisionHandler
+
+def make_handler():
+    world = World(rng=random.Random(0))
+    return world, CollisionHandler(world)
+
+def test_scalar_candidates():
+    world, handler = make_handler()
+    wall_y, wall_x = np.argwhere(~world.passable)[0]
+    assert handler.valid_moves(0, 0) == handler.is_valid_move(0, 0)
+    assert not handler.valid_moves(wall_x, wall_y)
+    assert not handler.valid_moves(-1, 0)
+    assert np.ndim(handler.valid_moves(0, 0)) == 0
+
+def test_arrays_match_is_valid_move():
+    world, handler = make_handler()
+    rng = np.random.default_rng(0)
+    xs = rng.integers(-3, world.grid_size + 3, size=(20, 4))
+    ys = rng.integers(-3, world.grid_height + 3, size=(20, 4))
+    valid = handler.valid_moves(xs, ys)
+    assert valid.shape == xs.shape
+    expected = [[handler.is_valid_move(x, y) for x, y in zip(row_x, row_y)] for row_x, row_y in zip(xs.tolist(), ys.tolist())]
+    assert valid.tolist() == expected
+    assert handler.valid_moves(xs[0], ys[0]).tolist() == expected[0]
+
+def test_out_of_bounds_is_invalid():
+    world, handler = make_handler()
+    xs = [-1, world.grid_size, 0, 0]
+    ys = [0, 0, -1, world.grid_height]
+    assert not handler.valid_moves(xs, ys).any()
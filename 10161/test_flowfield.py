@@ -0,0 +1,71 @@
+import random
+import numpy as np
+from types import SimpleNamespace
+from flowfield import bfs, components, FlowFields, UNREACHABLE
+from simulation import Simulation
+
+# 0 = open, 1 = wall: a wall splits the left column off, with a gap at the bottom
+GRID = np.array([
+    [0, 1, 0, 0],
+    [0, 1, 0, 0],
+    [0, 0, 0, 1],
+    [1, 1, 1, 0],
+]) == 0
+
+def test_bfs_distances():
+    dist = bfs(GRID, [(0, 0)])
+    assert dist[0, 0] == 0
+    assert dist[2, 1] == 3
+    assert dist[0, 3] == 7
+    assert dist[0, 1] == UNREACHABLE  # Wall
+    assert dist[3, 3] == UNREACHABLE  # Shut in by walls
+
+def test_bfs_without_sources():
+    assert (bfs(GRID, []) == UNREACHABLE).all()
+
+def test_components_and_reachable():
+    labels = components(GRID)
+    assert (labels == 0).tolist() == (~GRID).tolist()
+    assert labels[0, 0] == labels[0, 3] != labels[3, 3]
+    flow = FlowFields(SimpleNamespace(passable=GRID.copy()))
+    assert flow.reachable(0, 0, 3, 0)
+    assert not flow.reachable(0, 0, 3, 3)
+    assert flow.reachable(1, 0, 0, 1)  # A wall cell counts as its open neighbour's
+
+def test_next_step_walks_to_the_target():
+    flow = FlowFields(SimpleNamespace(passable=GRID.copy()))
+    field = flow.towards([(3, 0)])
+    x, y, steps = 0, 0, 0
+    while (step := field.next_step(x, y)) is not None:
+        x, y = step
+        assert GRID[y, x]
+        steps += 1
+    assert (x, y) == (3, 0)
+    assert steps == field.distance(0, 0) == 7
+    assert field.next_step(3, 3) is None
+
+def test_invalidate_drops_fields_near_the_change():
+    world = SimpleNamespace(passable=GRID.copy())
+    flow = FlowFields(world)
+    near, far = flow.towards([(0, 0)]), flow.towards([(3, 3)])
+    assert not flow.reachable(0, 0, 3, 3)
+    world.passable[3, 2] = True
+    flow.invalidate(2, 3)
+    assert flow.towards([(3, 3)]) is not far
+    assert flow.towards([(0, 0)]) is not near
+    assert flow.reachable(0, 0, 3, 3)
+    assert flow.towards([(0, 0)]).distance(3, 3) == 6
+
+def test_labels_match_random_grids():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        passable = rng.random((12, 9)) < 0.6
+        labels = components(passable)
+        dist = bfs(passable, [tuple(cell[::-1]) for cell in np.argwhere(labels == 1)[:1]])
+        assert ((dist != UNREACHABLE) == (labels == 1)).all()
+
+def test_simulation_grid_size():
+    sim = Simulation(seed=0, grid_size=32)
+    assert sim.world.passable.shape == (int(32 * 1.3), 32)
+    assert sim.cat_mapper.grid_size == 32
+    sim.run(ticks=50)
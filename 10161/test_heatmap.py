@@ -0,0 +1,28 @@
+import numpy as np
+from heatmap import Heatmap, HeatmapRecorder, CHANNELS
+from simulation import Simulation, SwarmSimulation
+
+def test_recorder_counts_single_and_swarm_runs():
+    sim = Simulation(seed=1)
+    recorder = HeatmapRecorder(sim.world.grid_size, sim.world.grid_height)
+    sim.attach(recorder)
+    sim.run(ticks=50)
+    assert recorder.counts[CHANNELS.index('visits')].sum() == 50
+
+    swarm_sim = SwarmSimulation(5, seed=1)
+    recorder = HeatmapRecorder(swarm_sim.world.grid_size, swarm_sim.world.grid_height)
+    swarm_sim.attach(recorder)
+    swarm_sim.run(ticks=20)
+    assert recorder.counts[CHANNELS.index('visits')].sum() == 5 * 20
+    assert recorder.counts[CHANNELS.index('seen')].sum() > 0
+
+def test_add_accumulates_counts_and_seeds(tmp_path):
+    path = str(tmp_path / 'heatmap')
+    heatmap = Heatmap.create(path, 8, 10)
+    chunk = np.ones(heatmap.shape, dtype=np.uint32)
+    heatmap.add(chunk, [3])
+    Heatmap.create(path, 8, 10).add(chunk, [4])  # A second writer on the same file
+    heatmap = Heatmap(path)
+    assert (heatmap.runs, heatmap.seeds) == (2, [3, 4])
+    assert (heatmap.counts == 2).all()
+    assert heatmap.by_zone().sum() == heatmap.grid().sum()
@@ -0,0 +1,32 @@
+from simulation import Simulation
+from replay import ReplayLog, WallClock, ReplayClock
+
+TICKS = 300
+CONFIG = {'bush_seek_chance': 0.7, 'rat_interval': 0.5}
+
+def state(sim):
+    metrics = sim.metrics()
+    del metrics['elapsed'], metrics['ticks_per_second']
+    return metrics, sorted(sim.world.rats), sim.cat_mapper.packed.tobytes()
+
+def test_same_seed_same_run():
+    a, b = Simulation(7, **CONFIG), Simulation(7, **CONFIG)
+    a.run(ticks=TICKS)
+    b.run(ticks=TICKS)
+    assert state(a) == state(b)
+
+def test_recorded_run_replays_exactly(tmp_path):
+    log = ReplayLog(7, CONFIG)
+    recorded = Simulation(7, clock=WallClock(log), **CONFIG)
+    recorded.run(ticks=TICKS)
+    assert len(log) == TICKS
+
+    path = tmp_path / 'run.replay'
+    log.save(path)
+    loaded = ReplayLog.load(path)
+    assert (loaded.seed, loaded.config, loaded.values()) == (7, CONFIG, log.values())
+
+    replayed = Simulation(loaded.seed, clock=ReplayClock(loaded), **loaded.config)
+    replayed.run(ticks=len(loaded))
+    assert replayed.clock.time == recorded.clock.time
+    assert state(replayed) == state(recorded)
@@ -0,0 +1,67 @@
+from replay import SimClock
+from scheduler import Scheduler
+
+def make_scheduler():
+    clock = SimClock(tick_seconds=1.0)
+    return clock, Scheduler(clock)
+
+def tick(clock, scheduler, n=1):
+    for _ in range(n):
+        clock.advance()
+        scheduler.run_due()
+
+def test_runs_in_time_order_ties_in_schedule_order():
+    clock, scheduler = make_scheduler()
+    ran = []
+    scheduler.at(3, ran.append, 'c')
+    scheduler.at(1, ran.append, 'a')
+    scheduler.at(3, ran.append, 'd')
+    scheduler.after(2, ran.append, 'b')
+    scheduler.at(1, ran.append, 'a2')
+    assert scheduler.next_time() == 1
+    tick(clock, scheduler)
+    assert ran == ['a', 'a2']
+    tick(clock, scheduler, 2)
+    assert ran == ['a', 'a2', 'b', 'c', 'd']
+    assert len(scheduler) == 0 and scheduler.next_time() is None
+
+def test_nothing_runs_before_it_is_due():
+    clock, scheduler = make_scheduler()
+    ran = []
+    scheduler.at(2.5, ran.append, 'late')
+    tick(clock, scheduler, 2)
+    assert ran == []
+    tick(clock, scheduler)
+    assert ran == ['late']
+
+def test_cancelled_events_are_skipped():
+    clock, scheduler = make_scheduler()
+    ran = []
+    event = scheduler.at(1, ran.append, 'cancelled')
+    scheduler.at(1, ran.append, 'kept')
+    event.cancel()
+    assert len(scheduler) == 1
+    tick(clock, scheduler)
+    assert ran == ['kept']
+
+def test_every_repeats_until_cancelled():
+    clock, scheduler = make_scheduler()
+    ran = []
+    handle = scheduler.every(2, lambda: ran.append(clock.now()))
+    assert handle.time == 2
+    tick(clock, scheduler, 6)
+    assert ran == [2.0, 4.0, 6.0]
+    assert handle.time == 8
+    handle.cancel()
+    tick(clock, scheduler, 4)
+    assert ran == [2.0, 4.0, 6.0]
+
+def test_events_scheduled_while_running_wait_for_their_time():
+    clock, scheduler = make_scheduler()
+    ran = []
+    scheduler.at(1, lambda: scheduler.after(0, ran.append, 'same tick'))
+    scheduler.at(1, lambda: scheduler.after(1, ran.append, 'next tick'))
+    tick(clock, scheduler)
+    assert ran == ['same tick']
+    tick(clock, scheduler)
+    assert ran == ['same tick', 'next tick']
@@ -0,0 +1,42 @@
+import random
+import numpy as np
+from world import World, RAT, BUSH, FOOD, SEPARATOR
+
+def make_world(rats=40, seed=0):
+    world = World(grid_size=32, rng=random.Random(seed))
+    rng = random.Random(seed)
+    for _ in range(rats):
+        world.add_rat(rng.randrange(world.grid_size), rng.randrange(world.grid_height))
+    return world
+
+def recount(world):
+    counts = np.zeros_like(world.rat_count)
+    for _, x, y in world.rats:
+        counts[y, x] += 1
+    return counts
+
+def test_rat_count_follows_moves_and_removals():
+    world = make_world()
+    for tick in range(50):
+        world.update_rats()
+        if tick % 10 == 0:
+            _, x, y = next(iter(world.rats))
+            world.remove_rat(x, y)
+            world.remove_dead_rats()
+        assert np.array_equal(world.rat_count, recount(world))
+        assert world.positions['rat'] == {(x, y) for _, x, y in world.rats}
+
+def test_window_counts_match_the_layers():
+    world = make_world()
+    rng = random.Random(1)
+    for tick in range(20):
+        world.update_rats()
+        if tick % 5 == 0:
+            x, y = rng.randrange(world.grid_size), rng.randrange(world.grid_height)
+            world.set_cell(x, y, rng.choice([None, 'separator', ('food', f'food_{tick}')]))
+        for _ in range(20):
+            y0, x0 = rng.randrange(world.grid_height), rng.randrange(world.grid_size)
+            y1, x1 = rng.randint(y0, world.grid_height), rng.randint(x0, world.grid_size)
+            assert world.count(RAT, y0, y1, x0, x1) == np.count_nonzero(world.rat_count[y0:y1, x0:x1])
+            for kind in (SEPARATOR, BUSH, FOOD):
+                assert world.count(kind, y0, y1, x0, x1) == np.count_nonzero(world.kind[y0:y1, x0:x1] == kind)
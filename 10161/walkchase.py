@@ -1,5 +1,5 @@
-import random
 from collision import apply_collision_rules
+from common.events import log
 
 class CatWalkChase:
     def __init__(self, cat, world, chem_manager):
@@ -10,7 +10,7 @@ class CatWalkChase:
     def random_walk(self):
         for _ in range(2):  # Two random steps
             directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-            random.shuffle(directions)
+            self.world.rng.shuffle(directions)
             
             for dx, dy in directions:
                 new_x = self.cat.x + dx
@@ -30,7 +30,11 @@ class CatWalkChase:
         dx = target_x - self.cat.x
         dy = target_y - self.cat.y
         
-        if abs(dx) > abs(dy):
+        if target_type == 'food':
+            # Food doesn't move: follow its flow field around the walls
+            step = self.world.flow.towards([(target_x, target_y)]).next_step(self.cat.x, self.cat.y)
+            new_x, new_y = step or (self.cat.x, self.cat.y)
+        elif abs(dx) > abs(dy):
             new_x = self.cat.x + (1 if dx > 0 else -1)
             new_y = self.cat.y
         else:
@@ -45,15 +49,12 @@ class CatWalkChase:
         return self.cat.x, self.cat.y
 
     def eat_target(self, target_type):
-        self.world.grid[self.cat.y][self.cat.x] = None
         self.cat.chasing = None
         if target_type == 'rat':
-            self.chem_manager.get_pool('ChemA').reduce(5)  # Remove STRESS^^^^
-            for rat in self.world.rats:
-                if rat.x == self.cat.x and rat.y == self.cat.y and rat.is_alive:
-                    rat.die()
-                    print(f"Rat eaten at ({self.cat.x}, {self.cat.y})")
-                    break
+            self.cat.chem_a.reduce(5)  # Remove STRESS^^^^
+            if self.world.remove_rat(self.cat.x, self.cat.y):
+                log.info('rat_eaten', tick=self.world.tick, x=self.cat.x, y=self.cat.y)
         else:
-            self.chem_manager.get_pool('ChemA').reduce(1)  # Remove STRESS^
+            self.world.set_cell(self.cat.x, self.cat.y, None)
+            self.cat.chem_a.reduce(1)  # Remove STRESS^
         self.cat.look.update_phase(target_type)
\ No newline at end of file
@@ -1,42 +1,250 @@
 import random
-import pygame
 import math
-from init import GRID_SIZE, WHITE, BLACK, RED, GREEN, BLUE
+import numpy as np
+from config import GRID_SIZE, WHITE, BLACK, RED, GREEN, BLUE
+from replay import SimClock
+from scheduler import Scheduler
+from common.events import log
+from flowfield import FlowFields
+from ecs import Table
 
-class Rat:
-    def __init__(self, x, y, world):
-        self.x = x
+# Cell kinds stored in World.kind (RAT only appears in World.kinds())
+EMPTY, SEPARATOR, BRIDGE, BUSH, FOOD, RAT = range(6)
+KIND_NAMES = [None, 'separator', 'bridge', 'bush', 'food', 'rat']
+KIND_CODES = {name: code for code, name in enumerate(KIND_NAMES) if name}
+
+def rat_name(rat_id):
+    return f'rat_{chr(97 + rat_id)}' if rat_id < 26 else f'rat_{rat_id}'
+
+class Rats(Table):
+    # Rat entities (see ecs.Table). Each rat patrols the clipped square of
+    # patrol_radius around its spawn, kept as four ints, and jumps to a
+    # uniform cell in it every tick.
+    COMPONENTS = {name: np.int32 for name in ('x', 'y', 'x0', 'x1', 'y0', 'y1', 'entity')}
+
+    def __init__(self, world, capacity=16, patrol_radius=4):
+        super().__init__(self.COMPONENTS, capacity)
+        self.world = world
+        self.patrol_radius = patrol_radius
+        # One generator for all moves, seeded from the world's RNG
+        self.np_rng = np.random.default_rng(world.rng.getrandbits(64))
+
+    def __iter__(self):
+        # (id, x, y) of the living rats
+        live = self.living()
+        return zip(self.id[live].tolist(), self.x[live].tolist(), self.y[live].tolist())
+
+    def add(self, x, y, entity):
+        r = self.patrol_radius
+        return super().add(x=x, y=y, entity=entity,
+                           x0=max(0, x - r), x1=min(self.world.grid_size - 1, x + r),
+                           y0=max(0, y - r), y1=min(self.world.grid_height - 1, y + r))
+
+    def move(self, live):
+        # All the given slots at once, one RNG draw
+        u = self.np_rng.random((2, len(live)))
+        x0, y0 = self.x0[live], self.y0[live]
+        self.x[live] = x0 + (u[0] * (self.x1[live] - x0 + 1)).astype(np.int32)
+        self.y[live] = y0 + (u[1] * (self.y1[live] - y0 + 1)).astype(np.int32)
+        return live
+
+    def find(self, x, y):
+        # Slot of a living rat at (x, y), or None
+        n = self.n
+        hits = np.flatnonzero((self.x[:n] == x) & (self.y[:n] == y) & self.alive[:n])
+        return int(hits[0]) if len(hits) else None
+
+def fenwick_chains(n, step):
+    # For every i in [0, n]: the indices visited from i by i = step(i) while in 1..n
+    chains = []
+    for i in range(n + 1):
+        chain = []
+        while 0 < i <= n:
+            chain.append(i)
+            i = step(i)
+        chains.append(tuple(chain))
+    return chains
+
+class Fenwick2D:
+    # Per-cell counts with point updates and rectangle sums, both
+    # O(log height * log width): for layers that change every tick, where a
+    # summed-area table would have to be patched over the whole grid. Plain
+    # lists, since each call touches a few dozen entries at most.
+    def __init__(self, height, width):
+        self.tree = [[0] * (width + 1) for _ in range(height + 1)]
+        self.up_y = fenwick_chains(height, lambda i: i + (i & -i))  # Cell y updates up_y[y + 1]
+        self.up_x = fenwick_chains(width, lambda i: i + (i & -i))
+        self.down_y = fenwick_chains(height, lambda i: i - (i & -i))  # Prefix [0, y) sums down_y[y]
+        self.down_x = fenwick_chains(width, lambda i: i - (i & -i))
+
+    def add(self, y, x, delta):
+        tree, xs = self.tree, self.up_x[x + 1]
+        for i in self.up_y[y + 1]:
+            row = tree[i]
+            for j in xs:
+                row[j] += delta
+
+    def prefix(self, y, x):
+        # Sum over [0, y) x [0, x)
+        tree, xs = self.tree, self.down_x[x]
+        total = 0
+        for i in self.down_y[y]:
+            row = tree[i]
+            for j in xs:
+                total += row[j]
+        return total
+
+    def sum(self, y0, y1, x0, x1):
+        return self.prefix(y1, x1) - self.prefix(y0, x1) - self.prefix(y1, x0) + self.prefix(y0, x0)
+
+class GridRow:
+    def __init__(self, world, y):
+        self.world = world
         self.y = y
+
+    def __getitem__(self, x):
+        world = self.world
+        return world.occupant(x, self.y) or world.cell(x, self.y)
+
+    def __setitem__(self, x, cell):
+        self.world.set_cell(x, self.y, cell)
+
+    def __len__(self):
+        return self.world.grid_size
+
+class GridView:
+    # Old list-of-lists access (world.grid[y][x]) on top of the layers
+    def __init__(self, world):
         self.world = world
-        self.patrol_radius = 4
-        self.patrol_area = self.get_patrol_area()
-        self.is_alive = True
-
-    def get_patrol_area(self):
-        x_start = max(0, self.x - self.patrol_radius)
-        x_end = min(self.world.grid_size - 1, self.x + self.patrol_radius)
-        y_start = max(0, self.y - self.patrol_radius)
-        y_end = min(self.world.grid_height - 1, self.y + self.patrol_radius)
-        return [(x, y) for x in range(x_start, x_end + 1) for y in range(y_start, y_end + 1)]
-
-    def move(self):
-        if not self.is_alive:
-            return
-        new_x, new_y = random.choice(self.patrol_area)
-        self.x, self.y = new_x, new_y
-
-    def die(self):
-        self.is_alive = False
-        print(f"Rat at ({self.x}, {self.y}) has died.")
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.world.grid_height:
+            raise IndexError(y)
+        return GridRow(self.world, y)
+
+    def __len__(self):
+        return self.world.grid_height
 
 class World:
-    def __init__(self):
-        self.grid_size = GRID_SIZE
-        self.grid_height = int(GRID_SIZE * 1.3)  # 30% longer upward
-        self.grid = [[None for _ in range(self.grid_size)] for _ in range(self.grid_height)]
-        self.rats = []
+    # Two layers: kind/entity hold terrain and objects (separator, bridge,
+    # bushes, food) and only change through set_cell; rat_count holds how many
+    # rats stand on each cell and is kept up to date by the rat methods. A rat over a
+    # bush or food hides it from kinds() but never erases it.
+    def __init__(self, grid_size=GRID_SIZE, grid_height=None, rng=None, clock=None):
+        self.rng = rng or random.Random()  # All randomness in a run comes from here
+        self.clock = clock or SimClock()
+        self.scheduler = Scheduler(self.clock)  # Future actions in simulated time, run by the simulation loop
+        self.grid_size = grid_size
+        self.grid_height = grid_height or int(grid_size * 1.3)  # 30% longer upward
+        self.kind = np.zeros((self.grid_height, self.grid_size), dtype=np.uint8)
+        self.entity = np.full((self.grid_height, self.grid_size), -1, dtype=np.int32)
+        self.rat_count = np.zeros((self.grid_height, self.grid_size), dtype=np.uint16)
+        self.passable = np.ones((self.grid_height, self.grid_size), dtype=bool)  # False on separator/bridge
+        self.names = []   # entity id -> name
+        self.colors = []  # entity id -> color (None if the kind has a fixed color)
+        self.entity_ids = {}
+        self.grid = GridView(self)
+        self.positions = {'bush': set(), 'food': set(), 'rat': set()}  # kind -> {(x, y)}, rats included
+        self.rats = Rats(self)
+        self.flow = FlowFields(self)  # Paths around the walls, see flowfield.py
+        self.tick = 0  # Set by the simulation loop, keys per-tick caches
+        self.changed = None  # Cells written since the renderer last drew; None when nothing draws
+        # Window counts: summed-area tables for the object kinds, kept up to
+        # date by set_cell, and a Fenwick tree of the cells with a rat on
+        # them, since those change every tick
+        self.sat = {code: np.zeros((self.grid_height + 1, self.grid_size + 1), dtype=np.int32)
+                    for code in (SEPARATOR, BRIDGE, BUSH, FOOD)}
+        self.rat_cells = Fenwick2D(self.grid_height, self.grid_size)
         self.create_environment()
 
+    def entity_id(self, name, color=None):
+        if name not in self.entity_ids:
+            self.entity_ids[name] = len(self.names)
+            self.names.append(name)
+            self.colors.append(color)
+        return self.entity_ids[name]
+
+    def cell(self, x, y):
+        kind = self.kind[y, x]
+        if kind == EMPTY:
+            return None
+        if kind == SEPARATOR or kind == BRIDGE:
+            return KIND_NAMES[kind]
+        entity = self.entity[y, x]
+        if kind == BUSH:
+            return ('bush', self.names[entity], self.colors[entity])
+        return (KIND_NAMES[kind], self.names[entity])
+
+    def occupant(self, x, y):
+        # ('rat', name) of a rat standing on (x, y), or None
+        if not self.rat_count[y, x]:
+            return None
+        rats = self.rats
+        return ('rat', self.names[rats.entity[rats.find(x, y)]])
+
+    def kinds(self, y0, y1, x0, x1):
+        # Both layers combined over a window (a copy): rats on top of whatever is there
+        kinds = self.kind[y0:y1, x0:x1].copy()
+        kinds[self.rat_count[y0:y1, x0:x1] > 0] = RAT
+        return kinds
+
+    def set_cell(self, x, y, cell):
+        # All object writes go through here so the position registry stays in sync
+        if self.changed is not None:
+            self.changed.add((x, y))
+        old = self.kind[y, x]
+        if old != EMPTY:
+            self.sat[old][y + 1:, x + 1:] -= 1
+        if old in (SEPARATOR, BRIDGE) or cell in ('separator', 'bridge'):
+            self.passable[y, x] = cell not in ('separator', 'bridge')
+            self.flow.invalidate(x, y)
+        if old >= BUSH:
+            self.positions[KIND_NAMES[old]].discard((x, y))
+        if cell is None:
+            self.kind[y, x] = EMPTY
+            self.entity[y, x] = -1
+        elif isinstance(cell, str):
+            self.kind[y, x] = KIND_CODES[cell]
+            self.entity[y, x] = -1
+        else:
+            self.kind[y, x] = KIND_CODES[cell[0]]
+            self.entity[y, x] = self.entity_id(cell[1], cell[2] if len(cell) > 2 else None)
+            self.positions[cell[0]].add((x, y))
+        if self.kind[y, x] != EMPTY:
+            self.sat[self.kind[y, x]][y + 1:, x + 1:] += 1
+
+    def mark_rat_cell(self, x, y, delta):
+        # A cell gained (+1) or lost (-1) its last rat
+        self.rat_cells.add(y, x, delta)
+
+    def count(self, kind, y0, y1, x0, x1):
+        # Cells of a kind in grid[y0:y1, x0:x1]; for RAT, cells with a rat on
+        # them. The cost doesn't depend on the size of the window
+        if kind == RAT:
+            return self.rat_cells.sum(y0, y1, x0, x1)
+        sat = self.sat[kind]
+        return int(sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0])
+
+    def window(self, x, y, radius):
+        # Grid bounds of the square of the given radius around (x, y), clipped
+        return (max(0, y - radius), min(self.grid_height, y + radius + 1),
+                max(0, x - radius), min(self.grid_size, x + radius + 1))
+
+    def nearest(self, kind, x, y, skip=None):
+        # skip(cell) -> True leaves that object out, e.g. bushes that are done
+        # Ties go to the lowest (y, x), same as a row-by-row scan of the grid
+        best = None
+        for px, py in self.positions[kind]:
+            if skip and skip(self.cell(px, py)):
+                continue
+            key = ((px - x)**2 + (py - y)**2, py, px)
+            if best is None or key < best:
+                best = key
+        return (best[2], best[1]) if best else None
+
+    def cells_of(self, kind):
+        return sorted(self.positions[kind], key=lambda pos: (pos[1], pos[0]))
+
     def create_environment(self):
         self.create_separator()
         self.create_bridge()
@@ -49,12 +257,12 @@ class World:
         separator_start = int(self.grid_height * 0.4)  # Start 40% from the top
         separator_end = int(self.grid_height * 0.8)    # End 80% from the top
         for y in range(separator_start, separator_end):
-            self.grid[y][separator_x] = 'separator'
+            self.set_cell(separator_x, y, 'separator')
 
     def create_bridge(self):
         bridge_y = self.grid_height // 4
         for x in range(self.grid_size // 4, 3 * self.grid_size // 4):
-            self.grid[bridge_y][x] = 'bridge'
+            self.set_cell(x, bridge_y, 'bridge')
 
     def create_bushes(self):
         bush_colors = [
@@ -75,8 +283,8 @@ class World:
         ]
         for i, ((x, y), color) in enumerate(zip(bush_positions, bush_colors)):
             bush_name = f'Bush{chr(65+i)}'  # BushA, BushB, etc.
-            self.grid[y][x] = ('bush', bush_name, color)
-            self.grid[y][x+1] = ('bush', bush_name, color)
+            self.set_cell(x, y, ('bush', bush_name, color))
+            self.set_cell(x+1, y, ('bush', bush_name, color))
 
     def create_food(self):
         food_positions = [
@@ -85,52 +293,97 @@ class World:
             (self.grid_size // 8, 3 * self.grid_height // 4)
         ]
         for i, (x, y) in enumerate(food_positions):
-            self.grid[y][x] = ('food', f'food_{chr(97+i)}')
+            self.set_cell(x, y, ('food', f'food_{chr(97+i)}'))
 
     def create_rats(self):
         rat_positions = [
             (7 * self.grid_size // 8, self.grid_height // 4),
             (3 * self.grid_size // 4, 3 * self.grid_height // 4)
         ]
-        for i, (x, y) in enumerate(rat_positions):
-            rat = Rat(x, y, self)
-            self.rats.append(rat)
-            self.grid[y][x] = ('rat', f'rat_{chr(97+i)}')
+        for x, y in rat_positions:
+            self.add_rat(x, y)
+
+    def add_rat(self, x, y):
+        name = rat_name(self.rats.next_id)
+        rat_id = self.rats.add(x, y, self.entity_id(name))
+        self.rat_count[y, x] += 1
+        if self.rat_count[y, x] == 1:
+            self.mark_rat_cell(x, y, 1)
+        self.positions['rat'].add((x, y))
+        if self.changed is not None:
+            self.changed.add((x, y))
+        return rat_id
+
+    def background_color(self, x):
+        return (240, 230, 220) if x < self.grid_size // 2 else (220, 210, 200)
+
+    def cell_color(self, x, y):
+        if self.rat_count[y, x]:
+            return RED
+        return self.object_color(x, y)
+
+    def object_color(self, x, y):
+        # Color of the terrain/object layer alone, ignoring rats
+        kind = self.kind[y, x]
+        if kind == EMPTY:
+            return None
+        if kind == SEPARATOR:
+            return BLACK
+        if kind == BRIDGE:
+            return (150, 75, 0)  # Brown
+        if kind == BUSH:
+            return self.colors[self.entity[y, x]]  # Use the bush's color
+        if kind == FOOD:
+            return (255, 165, 0)  # Orange
+        return WHITE
 
     def draw(self, screen, CELL_SIZE):
+        import pygame
         pygame.draw.rect(screen, (240, 230, 220), (0, 0, self.grid_size * CELL_SIZE // 2, self.grid_height * CELL_SIZE))
         pygame.draw.rect(screen, (220, 210, 200), (self.grid_size * CELL_SIZE // 2, 0, self.grid_size * CELL_SIZE // 2, self.grid_height * CELL_SIZE))
 
-        for y in range(self.grid_height):
-            for x in range(self.grid_size):
-                cell = self.grid[y][x]
-                if cell:
-                    if cell == 'separator':
-                        color = BLACK
-                    elif cell == 'bridge':
-                        color = (150, 75, 0)  # Brown
-                    elif isinstance(cell, tuple):
-                        if cell[0] == 'bush':
-                            color = cell[2]  # Use the bush's color
-                        elif cell[0] == 'food':
-                            color = (255, 165, 0)  # Orange
-                        elif cell[0] == 'rat':
-                            color = RED
-                    else:
-                        color = WHITE
-                    pygame.draw.rect(screen, color, (x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE))
+        for y, x in zip(*np.nonzero(self.kind)):
+            pygame.draw.rect(screen, self.cell_color(x, y), (x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE))
 
         # Draw only living rats
-        for rat in self.rats:
-            if rat.is_alive:
-                pygame.draw.rect(screen, RED, (rat.x*CELL_SIZE, rat.y*CELL_SIZE, CELL_SIZE, CELL_SIZE))
+        for _, x, y in self.rats:
+            pygame.draw.rect(screen, RED, (x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE))
 
     def update_rats(self):
-        for rat in self.rats:
-            if rat.is_alive:
-                self.grid[rat.y][rat.x] = None
-                rat.move()
-                self.grid[rat.y][rat.x] = ('rat', f'rat_{chr(97 + self.rats.index(rat))}')
+        # Batched move; the occupancy layer loses each rat's old cell and gains
+        # its new one, so the cost follows the rats, not the grid. The object
+        # layer is not touched
+        rats = self.rats
+        live = rats.living()
+        old_x, old_y = rats.x[live], rats.y[live]
+        rats.move(live)
+        new_x, new_y = rats.x[live], rats.y[live]
+
+        np.subtract.at(self.rat_count, (old_y, old_x), 1)
+        np.add.at(self.rat_count, (new_y, new_x), 1)
+        old, new = self.positions['rat'], set(zip(new_x.tolist(), new_y.tolist()))
+        for x, y in old - new:
+            self.mark_rat_cell(x, y, -1)
+        for x, y in new - old:
+            self.mark_rat_cell(x, y, 1)
+        self.positions['rat'] = new
+        if self.changed is not None:
+            self.changed.update(zip(old_x.tolist(), old_y.tolist()))
+            self.changed.update(self.positions['rat'])
+
+    def remove_rat(self, x, y):
+        i = self.rats.find(x, y)
+        if i is None:
+            return False
+        self.rats.kill(i)
+        log.info('rat_died', tick=self.tick, x=x, y=y)
+        self.rat_count[y, x] -= 1
+        if not self.rat_count[y, x]:
+            self.positions['rat'].discard((x, y))
+            self.mark_rat_cell(x, y, -1)
+        if self.changed is not None:
+            self.changed.add((x, y))
+        return True
 
     def remove_dead_rats(self):
-        self.rats = [rat for rat in self.rats if rat.is_alive]
\ No newline at end of file
+        self.rats.compact()
\ No newline at end of file
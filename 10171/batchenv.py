@@ -0,0 +1,237 @@
+import numpy as np
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, GRID_SIZE, FPS, RAT_SIZE, CAT_SIZE, CAT_NORMAL_SPEED, RAT_SPEEDS, RAT_HP
+from config import RAT_BURST_A_DURATION, RAT_BURST_A_COOLDOWN, RAT_BURST_B_HP_THRESHOLD, RAT_BURST_C_DURATION, RAT_BURST_SPEED_MULTIPLIER
+from config import CAT_NORMAL_VISION, CAT_HUNTING_VISION, JUMP_MODES, PREDICTION_UPDATE_TIME, INITIAL_SPEED_PREDICTION
+
+# Many independent rat/cat games stepped together, one array element per
+# game. step() does what GameEnvironment.update does (Rat.move, Cat.move,
+# Cat.update_prediction, Cat.check_collision, Rat.get_hit) for every game
+# at once, with a fixed frame time instead of clock.tick(FPS) and no
+# window. A game is done once its rat is caught; it stays frozen until
+# reset() is called for it.
+
+OBSERVATION = ['cat_x', 'cat_y', 'rat_x', 'rat_y', 'rat_speed', 'predicted_speed', 'hunting', 'jumping', 'rat_hp']
+AUTO = -1  # Action: jump the distance Cat.start_jump would pick from predicted_speed
+JUMPS = np.array(JUMP_MODES, dtype=np.float64)
+CORNER_BUFFER = 3 * GRID_SIZE
+TWO_PI = 2 * np.pi
+
+def normalized(x, y):
+    # Unit vectors, and which ones exist (Vector2.normalize raises on zero length)
+    length = np.sqrt(x * x + y * y)  # As pygame computes it
+    ok = length > 0
+    length = np.where(ok, length, 1)
+    return x / length, y / length, ok
+
+def rotated(x, y, degrees):
+    # Vector2.rotate, with its rounding (see Rat.head_for_center)
+    angle = np.fmod(degrees * np.pi / 180.0, TWO_PI)
+    angle = np.where(angle < 0, angle + TWO_PI, angle)
+    snap = (angle < 1e-6) | (angle > TWO_PI - 1e-6)
+    c = np.where(snap, 1.0, np.cos(angle))
+    s = np.where(snap, 0.0, np.sin(angle))
+    return c * x - s * y, s * x + c * y
+
+class BatchEnvironment:
+    def __init__(self, n, seed=None, frame_ms=None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.dt = (frame_ms if frame_ms is not None else round(1000 / FPS)) / 1000.0  # SimFrameClock by default
+
+        floats = ['rat_x', 'rat_y', 'base_speed', 'direction_x', 'direction_y', 'burst_a_time', 'burst_a_cooldown',
+                  'burst_c_time', 'speed_multiplier', 'cat_x', 'cat_y', 'vision', 'predicted_speed',
+                  'last_prediction_update', 'distance_spent', 'last_jump_time', 'last_hit_time',
+                  'jump_start_x', 'jump_start_y', 'jump_end_x', 'jump_end_y', 'jump_progress', 'elapsed_time']
+        ints = ['hp', 'wall_hits', 'hit_count', 'jumps_attempted', 'failed_jumps', 'free_energy', 'frames']
+        bools = ['hunted', 'burst_b_active', 'hunting', 'is_jumping', 'done']
+        for names, dtype in ((floats, np.float64), (ints, np.int64), (bools, bool)):
+            for name in names:
+                setattr(self, name, np.zeros(n, dtype=dtype))
+        self.reset()
+
+    def reset(self, games=None):
+        # Start new games: all of them, or the given indices / boolean mask.
+        # Returns the observations of every game.
+        if games is None:
+            games = np.arange(self.n)
+        else:
+            games = np.asarray(games)
+            if games.dtype == bool:
+                games = np.flatnonzero(games)
+        k = len(games)
+        rng = self.rng
+        # Rat.__init__
+        self.rat_x[games] = rng.integers(0, SCREEN_WIDTH - 30, size=k, endpoint=True)
+        self.rat_y[games] = rng.integers(0, SCREEN_HEIGHT - 30, size=k, endpoint=True)
+        self.base_speed[games] = rng.choice(RAT_SPEEDS, size=k)
+        self.direction_x[games], self.direction_y[games] = self.random_directions(k)
+        self.hp[games] = RAT_HP
+        self.speed_multiplier[games] = 1
+        for name in ('hunted', 'wall_hits', 'burst_a_time', 'burst_a_cooldown', 'burst_b_active', 'burst_c_time',
+                     'hit_count'):
+            getattr(self, name)[games] = 0
+        # Cat.__init__
+        self.cat_x[games] = SCREEN_WIDTH // 2
+        self.cat_y[games] = SCREEN_HEIGHT - 50
+        self.vision[games] = CAT_NORMAL_VISION
+        self.predicted_speed[games] = INITIAL_SPEED_PREDICTION
+        for name in ('hunting', 'last_prediction_update', 'jumps_attempted', 'distance_spent', 'last_jump_time',
+                     'last_hit_time', 'is_jumping', 'jump_progress', 'failed_jumps', 'free_energy',
+                     'elapsed_time', 'frames', 'done'):
+            getattr(self, name)[games] = 0
+        return self.observation()
+
+    def random_directions(self, k):
+        # Vector2(uniform(-1, 1), uniform(-1, 1)).normalize(), drawn again on the (measure zero) null vector
+        x, y, ok = normalized(*self.rng.uniform(-1, 1, size=(2, k)))
+        while not ok.all():
+            x[~ok], y[~ok], ok[~ok] = normalized(*self.rng.uniform(-1, 1, size=(2, int((~ok).sum()))))
+        return x, y
+
+    def observation(self):
+        # (n, len(OBSERVATION)) floats; rat_speed is Rat.get_actual_speed
+        return np.stack([self.cat_x, self.cat_y, self.rat_x, self.rat_y, self.base_speed * self.speed_multiplier,
+                         self.predicted_speed, self.hunting, self.is_jumping, self.hp], axis=1).astype(np.float64)
+
+    def step(self, actions=None):
+        # actions: per game, an index into JUMP_MODES for the next jump or AUTO.
+        # Returns (observations, rewards (hits this frame), done, info).
+        live = ~self.done
+        actions = np.full(self.n, AUTO) if actions is None else np.asarray(actions)
+        angle = self.rng.uniform(-30, 30, size=self.n)  # One draw per game, used by bursts and corner avoidance
+        self.move_rats(live, angle)
+        self.move_cats(live, actions)
+        self.update_predictions(live)
+        hits = self.check_collisions(live)
+        self.elapsed_time[live] += self.dt
+        self.frames[live] += 1
+        info = {'caught': hits & self.done, 'jumps_attempted': self.jumps_attempted,
+                'distance_spent': self.distance_spent, 'free_energy': self.free_energy}
+        return self.observation(), hits.astype(np.float64), self.done.copy(), info
+
+    def move_rats(self, live, angle):
+        # Rat.move
+        bursting = (self.burst_a_time > 0) | self.burst_b_active | (self.burst_c_time > 0)
+        self.speed_multiplier[live] = np.where(bursting, RAT_BURST_SPEED_MULTIPLIER, 1)[live]
+        to_center_x, to_center_y, centered = normalized(SCREEN_WIDTH / 2 - self.rat_x, SCREEN_HEIGHT / 2 - self.rat_y)
+        turn_x, turn_y = rotated(to_center_x, to_center_y, angle)
+        burst = live & (self.burst_a_time > 0)
+        normal = live & ~burst
+
+        # Rat.burst_move
+        turn = burst & centered
+        self.direction_x[turn], self.direction_y[turn] = turn_x[turn], turn_y[turn]
+        speed, multiplier = self.base_speed[burst], self.speed_multiplier[burst]
+        self.rat_x[burst] += self.direction_x[burst] * speed * multiplier / FPS
+        self.rat_y[burst] += self.direction_y[burst] * speed * multiplier / FPS
+
+        # Rat.normal_move
+        flee_x, flee_y, ok = normalized(self.rat_x - self.cat_x, self.rat_y - self.cat_y)
+        flee = normal & self.hunted
+        away = flee & ok
+        self.direction_x[away], self.direction_y[away] = flee_x[away], flee_y[away]
+        lost = flee & ~ok
+        if lost.any():
+            self.direction_x[lost], self.direction_y[lost] = self.random_directions(int(lost.sum()))
+        new_x = self.rat_x + self.direction_x * self.base_speed * self.speed_multiplier / FPS
+        new_y = self.rat_y + self.direction_y * self.base_speed * self.speed_multiplier / FPS
+
+        corner = ((new_x <= CORNER_BUFFER) | (new_x >= SCREEN_WIDTH - CORNER_BUFFER)) & \
+                 ((new_y <= CORNER_BUFFER) | (new_y >= SCREEN_HEIGHT - CORNER_BUFFER))
+        avoid = normal & corner & centered
+        self.direction_x[avoid], self.direction_y[avoid] = turn_x[avoid], turn_y[avoid]
+        walls = normal & ~corner
+        bounce_x = walls & ((new_x <= 0) | (new_x >= SCREEN_WIDTH - RAT_SIZE))
+        bounce_y = walls & ((new_y <= 0) | (new_y >= SCREEN_HEIGHT - RAT_SIZE))
+        self.direction_x[bounce_x] *= -1
+        self.direction_y[bounce_y] *= -1
+        self.wall_hits += bounce_x
+        self.wall_hits += bounce_y
+
+        start_a = normal & (self.wall_hits >= 3) & (self.burst_a_cooldown == 0)
+        self.burst_a_time[start_a] = RAT_BURST_A_DURATION
+        self.burst_a_cooldown[start_a] = RAT_BURST_A_COOLDOWN
+        self.wall_hits[start_a] = 0
+        self.rat_x[normal], self.rat_y[normal] = new_x[normal], new_y[normal]
+
+        np.clip(self.rat_x, 0, SCREEN_WIDTH - RAT_SIZE, out=self.rat_x, where=live)
+        np.clip(self.rat_y, 0, SCREEN_HEIGHT - RAT_SIZE, out=self.rat_y, where=live)
+
+        # Rat.check_hp and Rat.update_timers
+        self.burst_b_active |= live & (self.hp <= RAT_BURST_B_HP_THRESHOLD)
+        for timer in (self.burst_a_time, self.burst_a_cooldown, self.burst_c_time):
+            timer[live] = np.maximum(0, timer[live] - 1)
+
+    def move_cats(self, live, actions):
+        # Cat.move
+        t = self.elapsed_time
+        dx = self.rat_x - self.cat_x
+        dy = self.rat_y - self.cat_y
+        spotted = live & ~self.hunting & (np.abs(dx) <= self.vision) & (np.abs(dy) <= self.vision)
+        self.hunting |= spotted
+        self.vision[spotted] = CAT_HUNTING_VISION
+        self.predicted_speed[spotted] = INITIAL_SPEED_PREDICTION
+
+        hunting = live & self.hunting
+        jumping = hunting & self.is_jumping
+        jump = hunting & ~self.is_jumping & (t - self.last_jump_time >= 1.0)
+        walk = live & ~self.hunting
+
+        # Cat.continue_jump
+        self.jump_progress[jumping] += 0.1
+        landed = jumping & (self.jump_progress >= 1)
+        flying = jumping & ~landed
+        self.cat_x[landed], self.cat_y[landed] = self.jump_end_x[landed], self.jump_end_y[landed]
+        self.is_jumping[landed] = False
+        progress = self.jump_progress[flying]  # Vector2.lerp
+        self.cat_x[flying] = self.jump_start_x[flying] * (1 - progress) + self.jump_end_x[flying] * progress
+        self.cat_y[flying] = self.jump_start_y[flying] * (1 - progress) + self.jump_end_y[flying] * progress
+
+        # Cat.start_jump: the smallest mode at or above predicted_speed unless an action picks one
+        direction_x, direction_y, _ = normalized(dx, dy)
+        chosen = JUMPS[np.minimum(np.searchsorted(JUMPS, self.predicted_speed), len(JUMPS) - 1)]
+        distance = np.where(actions == AUTO, chosen, JUMPS[np.clip(actions, 0, len(JUMPS) - 1)])
+        self.is_jumping[jump] = True
+        self.jump_start_x[jump], self.jump_start_y[jump] = self.cat_x[jump], self.cat_y[jump]
+        self.jump_end_x[jump] = self.cat_x[jump] + direction_x[jump] * distance[jump]
+        self.jump_end_y[jump] = self.cat_y[jump] + direction_y[jump] * distance[jump]
+        self.jump_progress[jump] = 0
+        self.jumps_attempted += jump
+        self.distance_spent[jump] += distance[jump]
+        self.last_jump_time[jump] = t[jump]
+
+        # Walking towards the rat
+        self.cat_x[walk] += direction_x[walk] * CAT_NORMAL_SPEED / FPS
+        self.cat_y[walk] += direction_y[walk] * CAT_NORMAL_SPEED / FPS
+
+        np.clip(self.cat_x, 0, SCREEN_WIDTH - CAT_SIZE, out=self.cat_x, where=live)
+        np.clip(self.cat_y, 0, SCREEN_HEIGHT - CAT_SIZE, out=self.cat_y, where=live)
+
+    def update_predictions(self, live):
+        # Cat.update_prediction with Rat.get_actual_speed
+        t = self.elapsed_time
+        rat_speed = self.base_speed * self.speed_multiplier
+        due = live & self.hunting & (t - self.last_prediction_update >= PREDICTION_UPDATE_TIME)
+        lower = due & (self.predicted_speed > rat_speed)
+        raise_ = due & ~lower & ((self.predicted_speed < rat_speed) | (self.failed_jumps >= 6))
+        self.predicted_speed[lower] = np.maximum(self.predicted_speed[lower] - GRID_SIZE / 2, JUMPS[0])
+        self.predicted_speed[raise_] = np.minimum(self.predicted_speed[raise_] + GRID_SIZE / 2, JUMPS[-1])
+        self.free_energy += raise_ & (self.failed_jumps >= 6)
+        self.failed_jumps[raise_] = 0
+        self.last_prediction_update[due] = t[due]
+
+    def check_collisions(self, live):
+        # Cat.check_collision and Rat.get_hit; a cat in mid-jump never collides
+        t = self.elapsed_time
+        overlap = ((self.cat_x < self.rat_x + RAT_SIZE) & (self.cat_x + CAT_SIZE > self.rat_x) &
+                   (self.cat_y < self.rat_y + RAT_SIZE) & (self.cat_y + CAT_SIZE > self.rat_y))
+        hits = live & ~self.is_jumping & overlap & (t - self.last_hit_time >= 0.5)
+        self.last_hit_time[hits] = t[hits]
+        self.hp -= hits
+        self.hunted |= hits
+        self.hit_count += hits
+        burst_c = hits & (self.hit_count >= 5)
+        self.burst_c_time[burst_c] = RAT_BURST_C_DURATION
+        self.hit_count[burst_c] = 0
+        self.done |= hits & (self.hp <= 0)
+        return hits
@@ -1,9 +1,16 @@
 import pygame
 import random
 import math
+from common.events import log
 from config import CAT_SIZE, CAT_NORMAL_SPEED, SCREEN_WIDTH, SCREEN_HEIGHT, GRID_SIZE, CAT_NORMAL_VISION, CAT_HUNTING_VISION, JUMP_MODES, PREDICTION_UPDATE_TIME, FPS, GREEN, LIGHT_RED, INITIAL_SPEED_PREDICTION
 
 class Cat:
+    # Plain floats instead of Vector2 temporaries, same arithmetic as pygame
+    __slots__ = ('x', 'y', 'size', 'speed', 'hunting', 'vision', 'predicted_speed', 'last_prediction_update',
+                 'jumps_attempted', 'distance_spent', 'last_jump_time', 'last_hit_time', 'is_jumping',
+                 'jump_start_x', 'jump_start_y', 'jump_end_x', 'jump_end_y', 'jump_progress', 'failed_jumps',
+                 'free_energy')
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -18,8 +25,8 @@ class Cat:
         self.last_jump_time = 0
         self.last_hit_time = 0
         self.is_jumping = False
-        self.jump_start_pos = None
-        self.jump_end_pos = None
+        self.jump_start_x = self.jump_start_y = 0.0
+        self.jump_end_x = self.jump_end_y = 0.0
         self.jump_progress = 0
         self.failed_jumps = 0
         self.free_energy = 0
@@ -30,7 +37,6 @@ class Cat:
 
         dx = rat.x - self.x
         dy = rat.y - self.y
-        distance = math.hypot(dx, dy)
         
         if abs(dx) <= self.vision and abs(dy) <= self.vision and not self.hunting:
             self.start_hunting()
@@ -42,9 +48,9 @@ class Cat:
                 self.start_jump(rat)
                 self.last_jump_time = current_time
         else:
-            direction = pygame.math.Vector2(dx, dy).normalize()
-            self.x += direction.x * self.speed / FPS
-            self.y += direction.y * self.speed / FPS
+            length = math.sqrt(dx * dx + dy * dy)  # Never 0 here: the rat would be in sight
+            self.x += dx / length * self.speed / FPS
+            self.y += dy / length * self.speed / FPS
 
         self.x = max(0, min(self.x, SCREEN_WIDTH - self.size))
         self.y = max(0, min(self.y, SCREEN_HEIGHT - self.size))
@@ -52,30 +58,40 @@ class Cat:
     def start_jump(self, rat):
         dx = rat.x - self.x
         dy = rat.y - self.y
-        direction = pygame.math.Vector2(dx, dy).normalize()
+        length = math.sqrt(dx * dx + dy * dy)
+        if length:
+            dx /= length
+            dy /= length
         
-        if self.predicted_speed >= JUMP_MODES[-1]:
-            jump_distance = JUMP_MODES[-1]
-        else:
-            jump_distance = min([j for j in JUMP_MODES if j >= self.predicted_speed], key=lambda x: abs(x - self.predicted_speed))
+        # Closest mode at or above the prediction; modes are ascending
+        jump_distance = JUMP_MODES[-1]
+        for mode in JUMP_MODES:
+            if mode >= self.predicted_speed:
+                jump_distance = mode
+                break
         
         self.is_jumping = True
-        self.jump_start_pos = pygame.math.Vector2(self.x, self.y)
-        self.jump_end_pos = self.jump_start_pos + direction * jump_distance
+        self.jump_start_x = self.x
+        self.jump_start_y = self.y
+        self.jump_end_x = self.x + dx * jump_distance
+        self.jump_end_y = self.y + dy * jump_distance
         self.jump_progress = 0
         self.jumps_attempted += 1
         self.distance_spent += jump_distance
 
-        print(f"Jumping with predicted speed: {self.predicted_speed/GRID_SIZE:.2f}, chosen jump distance: {jump_distance/GRID_SIZE}")
+        log.info('jump', predicted_speed=self.predicted_speed / GRID_SIZE, jump_distance=jump_distance / GRID_SIZE)
 
     def continue_jump(self):
         self.jump_progress += 0.1
         if self.jump_progress >= 1:
-            self.x, self.y = self.jump_end_pos.x, self.jump_end_pos.y
+            self.x = self.jump_end_x
+            self.y = self.jump_end_y
             self.is_jumping = False
         else:
-            pos = self.jump_start_pos.lerp(self.jump_end_pos, self.jump_progress)
-            self.x, self.y = pos.x, pos.y
+            # Vector2.lerp
+            t = self.jump_progress
+            self.x = self.jump_start_x * (1 - t) + self.jump_end_x * t
+            self.y = self.jump_start_y * (1 - t) + self.jump_end_y * t
 
     def update_prediction(self, elapsed_time, rat_speed):
         if self.hunting:
@@ -88,7 +104,8 @@ class Cat:
                         self.free_energy += 1
                     self.failed_jumps = 0
                 self.last_prediction_update = elapsed_time
-                print(f"Updated predicted speed: {self.predicted_speed/GRID_SIZE:.2f}, Free Energy: {self.free_energy}")
+                log.info('prediction_updated', elapsed=elapsed_time, predicted_speed=self.predicted_speed / GRID_SIZE,
+                         free_energy=self.free_energy)
 
     def draw(self, screen):
         pygame.draw.rect(screen, GREEN, (self.x, self.y, self.size, self.size))
@@ -3,14 +3,20 @@ import random
 from config import SCREEN_WIDTH, SCREEN_HEIGHT, WHITE, FPS, GRID_SIZE, GREEN, BLACK
 from rat import Rat
 from cat import Cat
+from replay import FrameClock, SimFrameClock
+from common.profiler import profiler
 
 class GameEnvironment:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        self.clock = pygame.time.Clock()
-        self.rat = Rat(random.randint(0, SCREEN_WIDTH - 30), random.randint(0, SCREEN_HEIGHT - 30))
+    def __init__(self, seed=None, clock=None, headless=False):
+        # Same seed and frame times give the same game, see replay.py.
+        # Headless games default to fixed frame times without waiting.
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.clock = clock or (SimFrameClock() if headless else FrameClock())
+        self.screen = None if headless else pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.rat = Rat(self.rng.randint(0, SCREEN_WIDTH - 30), self.rng.randint(0, SCREEN_HEIGHT - 30), self.rng)
         self.cat = Cat(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 50)
-        self.font = pygame.font.Font(None, 24)
+        self.font = None if headless else pygame.font.Font(None, 24)
         self.collision_points = []
         self.game_over = False
         self.elapsed_time = 0
@@ -22,14 +28,29 @@ class GameEnvironment:
                 if event.type == pygame.QUIT:
                     running = False
 
+            t = profiler.start()
             self.update()
+            profiler.stop('update', t)
+            t = profiler.start()
             self.draw()
+            profiler.stop('draw', t)
+            t = profiler.start()
             pygame.display.flip()
+            profiler.stop('flip', t)
+            profiler.tick()
+            self.elapsed_time += self.clock.tick(FPS) / 1000.0
+
+    def run_headless(self, frames):
+        for _ in range(frames):
+            t = profiler.start()
+            self.update()
+            profiler.stop('update', t)
+            profiler.tick()
             self.elapsed_time += self.clock.tick(FPS) / 1000.0
 
     def update(self):
         if self.rat:
-            self.rat.move(pygame.math.Vector2(self.cat.x, self.cat.y))
+            self.rat.move(self.cat.x, self.cat.y)
         self.cat.move(self.rat, self.elapsed_time)
         if self.rat:
             self.cat.update_prediction(self.elapsed_time, self.rat.get_actual_speed())
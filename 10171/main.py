@@ -1,14 +1,60 @@
 import pygame
+import random
+import argparse
+from common.events import configure, LEVEL_NAMES
+from common.profiler import profiler
 from game_environment import GameEnvironment
+from replay import ReplayLog, FrameClock, ReplayFrameClock
 
 def main():
+    parser = argparse.ArgumentParser(description="Object Features Classifier Simulation")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--record', metavar='PATH', help="save a replay log of the run")
+    parser.add_argument('--replay', metavar='PATH', help="re-run a recorded run headless")
+    parser.add_argument('--log', metavar='PATH', help="write events to a JSONL file")
+    parser.add_argument('--log-level', choices=list(LEVEL_NAMES.values()), default='info')
+    parser.add_argument('--profile', type=int, metavar='FRAMES', nargs='?', const=0, default=None,
+                        help="time update/draw/flip; print a summary every FRAMES frames and at the end")
+    parser.add_argument('--profile-dump', metavar='PATH', help="write the profile as JSON at the end")
+    args = parser.parse_args()
+
+    levels = {name: level for level, name in LEVEL_NAMES.items()}
+    configure(levels[args.log_level], args.log)
+    if args.profile is not None or args.profile_dump:
+        profiler.report_every = args.profile or None
+        profiler.set_enabled(True)
+    try:
+        run(args)
+    finally:
+        if profiler.enabled:
+            print(profiler.format())
+            if args.profile_dump:
+                profiler.dump(args.profile_dump)
+
+def run(args):
     pygame.init()
+
+    if args.replay:
+        log = ReplayLog.load(args.replay)
+        game_env = GameEnvironment(log.seed, clock=ReplayFrameClock(log), headless=True)
+        game_env.run_headless(len(log))
+        print(f"Replayed {len(log)} frames: elapsed {game_env.elapsed_time:.3f}s, "
+              f"rat HP {game_env.rat.hp if game_env.rat else 'N/A'}, jumps {game_env.cat.jumps_attempted}")
+        pygame.quit()
+        return
+
     pygame.display.set_caption("Object Features Classifier Simulation")
 
-    game_env = GameEnvironment()
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+    log = ReplayLog(seed)
+    game_env = GameEnvironment(seed, clock=FrameClock(log))
     game_env.run()
 
     pygame.quit()
 
+    if args.record:
+        log.save(args.record)
+        print(f"Replay log ({len(log)} frames, seed {seed}) saved to {args.record}")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -4,16 +4,25 @@ import math
 from config import RAT_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT, RAT_SPEEDS, GRID_SIZE, RAT_HP, FPS, BLUE, RED
 from config import RAT_BURST_A_DURATION, RAT_BURST_A_COOLDOWN, RAT_BURST_B_HP_THRESHOLD, RAT_BURST_C_DURATION, RAT_BURST_SPEED_MULTIPLIER
 
+TWO_PI = 2 * math.pi
+
 class Rat:
-    def __init__(self, x, y):
+    # Plain floats instead of Vector2 temporaries; the arithmetic is the one
+    # pygame does, so positions come out the same to the last bit
+    __slots__ = ('rng', 'x', 'y', 'size', 'base_speed', 'speed', 'hp', 'hunted', 'direction_x', 'direction_y',
+                 'color', 'wall_hits', 'burst_a_time', 'burst_a_cooldown', 'burst_b_active', 'burst_c_time',
+                 'hit_count', 'speed_multiplier')
+
+    def __init__(self, x, y, rng=None):
+        self.rng = rng or random.Random()
         self.x = x
         self.y = y
         self.size = RAT_SIZE
-        self.base_speed = random.choice(RAT_SPEEDS)
+        self.base_speed = self.rng.choice(RAT_SPEEDS)
         self.speed = self.base_speed
         self.hp = RAT_HP
         self.hunted = False
-        self.direction = pygame.math.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()
+        self.random_direction()
         self.color = BLUE
         self.wall_hits = 0
         self.burst_a_time = 0
@@ -23,34 +32,47 @@ class Rat:
         self.hit_count = 0
         self.speed_multiplier = 1
 
-    def move(self, cat_pos):
+    def random_direction(self):
+        x = self.rng.uniform(-1, 1)
+        y = self.rng.uniform(-1, 1)
+        length = math.sqrt(x * x + y * y)
+        if length == 0:
+            raise ValueError("Can't normalize Vector of length Zero")
+        self.direction_x = x / length
+        self.direction_y = y / length
+
+    def move(self, cat_x, cat_y):
         self.update_speed_multiplier()
         if self.burst_a_time > 0:
             self.burst_move()
         else:
-            self.normal_move(cat_pos)
+            self.normal_move(cat_x, cat_y)
         self.check_hp()
         self.update_timers()
 
-    def normal_move(self, cat_pos):
+    def normal_move(self, cat_x, cat_y):
         if self.hunted:
-            try:
-                self.direction = (pygame.math.Vector2(self.x, self.y) - cat_pos).normalize()
-            except ValueError:
-                self.direction = pygame.math.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()
+            dx = self.x - cat_x
+            dy = self.y - cat_y
+            length = math.sqrt(dx * dx + dy * dy)
+            if length:
+                self.direction_x = dx / length
+                self.direction_y = dy / length
+            else:
+                self.random_direction()
         
-        new_x = self.x + self.direction.x * self.speed * self.speed_multiplier / FPS
-        new_y = self.y + self.direction.y * self.speed * self.speed_multiplier / FPS
+        new_x = self.x + self.direction_x * self.speed * self.speed_multiplier / FPS
+        new_y = self.y + self.direction_y * self.speed * self.speed_multiplier / FPS
 
         corner_buffer = 3 * GRID_SIZE
         if self.is_in_corner(new_x, new_y, corner_buffer):
             self.avoid_corner()
         else:
             if new_x <= 0 or new_x >= SCREEN_WIDTH - self.size:
-                self.direction.x *= -1
+                self.direction_x *= -1
                 self.wall_hits += 1
             if new_y <= 0 or new_y >= SCREEN_HEIGHT - self.size:
-                self.direction.y *= -1
+                self.direction_y *= -1
                 self.wall_hits += 1
 
         if self.wall_hits >= 3 and self.burst_a_cooldown == 0:
@@ -60,12 +82,10 @@ class Rat:
         self.y = max(0, min(new_y, SCREEN_HEIGHT - self.size))
 
     def burst_move(self):
-        center = pygame.math.Vector2(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
-        to_center = (center - pygame.math.Vector2(self.x, self.y)).normalize()
-        self.direction = to_center.rotate(random.uniform(-30, 30))
+        self.head_for_center()
         
-        self.x += self.direction.x * self.speed * self.speed_multiplier / FPS
-        self.y += self.direction.y * self.speed * self.speed_multiplier / FPS
+        self.x += self.direction_x * self.speed * self.speed_multiplier / FPS
+        self.y += self.direction_y * self.speed * self.speed_multiplier / FPS
         
         self.x = max(0, min(self.x, SCREEN_WIDTH - self.size))
         self.y = max(0, min(self.y, SCREEN_HEIGHT - self.size))
@@ -77,10 +97,29 @@ class Rat:
                 (x >= SCREEN_WIDTH - buffer and y >= SCREEN_HEIGHT - buffer))
 
     def avoid_corner(self):
-        center = pygame.math.Vector2(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
-        to_center = (center - pygame.math.Vector2(self.x, self.y)).normalize()
-        angle = random.uniform(-30, 30)
-        self.direction = to_center.rotate(angle)
+        self.head_for_center()
+
+    def head_for_center(self):
+        # Towards the screen center, turned by up to 30 degrees either way
+        # (Vector2.normalize + Vector2.rotate); unchanged on the center itself
+        x = SCREEN_WIDTH / 2 - self.x
+        y = SCREEN_HEIGHT / 2 - self.y
+        length = math.sqrt(x * x + y * y)
+        if length == 0:
+            return
+        x /= length
+        y /= length
+        angle = math.fmod(self.rng.uniform(-30, 30) * math.pi / 180.0, TWO_PI)
+        if angle < 0:
+            angle += TWO_PI
+        if angle < 1e-6 or angle > TWO_PI - 1e-6:  # Vector2.rotate snaps these to exactly 0
+            self.direction_x = x
+            self.direction_y = y
+            return
+        c = math.cos(angle)
+        s = math.sin(angle)
+        self.direction_x = c * x - s * y
+        self.direction_y = s * x + c * y
 
     def start_burst_a(self):
         self.burst_a_time = RAT_BURST_A_DURATION
@@ -0,0 +1,63 @@
+import json
+import zlib
+import pygame
+from array import array
+
+# GameEnvironment advances elapsed_time by whatever clock.tick(FPS) returns
+# (milliseconds). Recording those values next to the seed is enough to
+# re-run a game exactly, headless and without waiting for real time.
+
+class FrameClock:
+    # pygame's frame limiter, optionally recording each frame time into a ReplayLog
+    def __init__(self, log=None):
+        self.clock = pygame.time.Clock()
+        self.log = log
+
+    def tick(self, fps):
+        ms = self.clock.tick(fps)
+        if self.log is not None:
+            self.log.record(ms)
+        return ms
+
+class SimFrameClock:
+    # Fixed frame time, no waiting: headless runs at full speed
+    def tick(self, fps):
+        return round(1000 / fps)
+
+class ReplayFrameClock:
+    # Feeds back the frame times of a recorded run
+    def __init__(self, log):
+        self.values = list(log.values)
+        self.index = 0
+
+    def tick(self, fps):
+        ms = self.values[self.index]
+        self.index += 1
+        return ms
+
+class ReplayLog:
+    # Seed plus one frame time per frame, zlib compressed
+    def __init__(self, seed, config=None):
+        self.seed = seed
+        self.config = config or {}
+        self.values = array('q')  # 8 bytes everywhere; 'l' is 4 on Windows
+
+    def record(self, value):
+        self.values.append(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def save(self, path):
+        header = json.dumps({'seed': self.seed, 'config': self.config, 'frames': len(self.values)})
+        with open(path, 'wb') as f:
+            f.write(header.encode() + b'\n')
+            f.write(zlib.compress(self.values.tobytes()))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+            log = cls(header['seed'], header['config'])
+            log.values.frombytes(zlib.decompress(f.read()))
+        return log
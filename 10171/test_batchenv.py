@@ -0,0 +1,60 @@
+import numpy as np
+from batchenv import BatchEnvironment, OBSERVATION
+from game_environment import GameEnvironment
+
+GAMES = 32
+FRAMES = 3000
+
+class AngleFeed:
+    # Stands in for a scalar rat's rng: hands it the angle the batch drew for its game
+    def __init__(self):
+        self.angle = 0.0
+
+    def uniform(self, a, b):
+        return self.angle
+
+def scalar_games(batch):
+    # One headless GameEnvironment per batch game, started from the same state
+    games, feeds = [], []
+    for i in range(batch.n):
+        game = GameEnvironment(seed=i, headless=True)
+        rat = game.rat
+        rat.x, rat.y = float(batch.rat_x[i]), float(batch.rat_y[i])
+        rat.base_speed = rat.speed = batch.base_speed[i].item()
+        rat.direction_x, rat.direction_y = float(batch.direction_x[i]), float(batch.direction_y[i])
+        rat.rng = AngleFeed()
+        games.append(game)
+        feeds.append(rat.rng)
+    return games, feeds
+
+def observation(game):
+    cat, rat = game.cat, game.rat
+    return [cat.x, cat.y, rat.x, rat.y, rat.get_actual_speed(), cat.predicted_speed, cat.hunting,
+            cat.is_jumping, rat.hp]
+
+def test_batch_matches_scalar_games():
+    batch = BatchEnvironment(GAMES, seed=0)
+    games, feeds = scalar_games(batch)
+    angles = np.random.default_rng()
+    angles.bit_generator.state = batch.rng.bit_generator.state  # The batch draws one angle per game per frame
+    caught = 0
+    for frame in range(FRAMES):
+        for feed, angle in zip(feeds, angles.uniform(-30, 30, size=GAMES).tolist()):
+            feed.angle = angle
+        before = batch.observation()
+        obs, _, done, info = batch.step()
+        for i, game in enumerate(games):
+            if game.game_over:
+                assert done[i]
+                assert (obs[i] == before[i]).all()  # Frozen until reset
+                continue
+            game.run_headless(1)
+            if game.game_over:
+                assert done[i] and info['caught'][i]
+                caught += 1
+                continue
+            assert not done[i]
+            assert obs[i].tolist() == observation(game), (frame, i, OBSERVATION)
+            assert info['jumps_attempted'][i] == game.cat.jumps_attempted
+            assert info['distance_spent'][i] == game.cat.distance_spent
+    assert caught  # The comparison got as far as catching rats
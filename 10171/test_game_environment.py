@@ -0,0 +1,42 @@
+import random
+from game_environment import GameEnvironment
+from replay import ReplayLog, FrameClock, ReplayFrameClock, SimFrameClock
+
+def state(game):
+    rat = game.rat
+    return (game.elapsed_time, game.cat.x, game.cat.y, game.cat.predicted_speed, game.cat.jumps_attempted,
+            None if rat is None else (rat.x, rat.y, rat.hp), game.collision_points, game.game_over)
+
+def test_headless_defaults_to_sim_frames():
+    game = GameEnvironment(seed=3, headless=True)
+    assert isinstance(game.clock, SimFrameClock)
+
+def test_same_seed_same_game():
+    a, b = GameEnvironment(seed=3, headless=True), GameEnvironment(seed=3, headless=True)
+    a.run_headless(2000)
+    b.run_headless(2000)
+    assert state(a) == state(b)
+
+def test_frame_clock_records():
+    log = ReplayLog(3)
+    game = GameEnvironment(seed=3, clock=FrameClock(log), headless=True)
+    game.run_headless(5)
+    assert len(log) == 5
+    assert abs(game.elapsed_time - sum(log.values) / 1000.0) < 1e-9
+
+def test_saved_log_replays_exactly(tmp_path):
+    # Uneven frame times, as a real window would give
+    frame_times = random.Random(0).choices(range(10, 40), k=2000)
+    log = ReplayLog(3, {'note': 'uneven'})
+    for ms in frame_times:
+        log.record(ms)
+    path = tmp_path / 'game.replay'
+    log.save(path)
+    loaded = ReplayLog.load(path)
+    assert (loaded.seed, loaded.config, list(loaded.values)) == (3, {'note': 'uneven'}, frame_times)
+
+    recorded = GameEnvironment(seed=3, clock=ReplayFrameClock(log), headless=True)
+    recorded.run_headless(len(log))
+    replayed = GameEnvironment(seed=loaded.seed, clock=ReplayFrameClock(loaded), headless=True)
+    replayed.run_headless(len(loaded))
+    assert state(replayed) == state(recorded)
@@ -0,0 +1,106 @@
+import json
+import time
+import atexit
+import threading
+from collections import deque
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: 'debug', INFO: 'info', WARNING: 'warning', ERROR: 'error'}
+
+def _discard(event, **fields):
+    pass
+
+def _json_default(value):
+    # numpy scalars and arrays as plain numbers and lists, anything else as text
+    tolist = getattr(value, 'tolist', None)
+    return tolist() if callable(tolist) else str(value)
+
+class EventLog:
+    # Structured events (type + fields) go into an in-memory ring buffer; a
+    # background thread writes them to a JSONL file in batches. Methods for
+    # levels below the threshold are swapped for a no-op, so disabled calls
+    # cost one empty function call.
+    def __init__(self, level=INFO, path=None, capacity=100_000, flush_interval=0.5):
+        self.buffer = deque(maxlen=capacity)  # Oldest events drop off if the writer falls behind
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.path = None
+        self.file = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.set_level(level)
+        if path:
+            self.open(path)
+
+    def set_level(self, level):
+        self.level = level
+        for method_level, name in LEVEL_NAMES.items():
+            if method_level >= level:
+                setattr(self, name, self._emitter(method_level))
+            else:
+                setattr(self, name, _discard)
+
+    def _emitter(self, level):
+        append = self.buffer.append
+        def emit(event, **fields):
+            append((time.time(), level, event, fields))
+        return emit
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def open(self, path):
+        # Start writing to a JSONL file on a background thread
+        self.close()
+        self.path = path
+        self.file = open(path, 'a')
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name='event-log-writer', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        if self.file is None:
+            return
+        with self.lock:
+            lines = []
+            popleft = self.buffer.popleft
+            try:
+                while True:
+                    timestamp, level, event, fields = popleft()
+                    record = {'ts': timestamp, 'level': LEVEL_NAMES[level], 'event': event}
+                    record.update(fields)
+                    lines.append(json.dumps(record, default=_json_default))
+            except IndexError:
+                pass
+            if lines:
+                self.file.write('\n'.join(lines) + '\n')
+                self.file.flush()
+
+    def recent(self, n=None):
+        # Buffered events not yet written, oldest first (all of them when there is no file)
+        events = list(self.buffer)
+        return events if n is None else events[-n:]
+
+    def close(self):
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+log = EventLog()
+atexit.register(log.close)  # Write out whatever is still buffered
+
+def configure(level=INFO, path=None):
+    log.set_level(level)
+    if path:
+        log.open(path)
+    return log
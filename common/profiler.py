@@ -0,0 +1,149 @@
+import json
+import time
+
+# Tick-phase timings and counters. Loops bracket each phase with
+#     t = profiler.start(); ...; profiler.stop('phase', t)
+# and count work with profiler.count('name', n). While disabled, start and
+# stop are swapped for no-ops (same trick as events.EventLog), so the
+# instrumentation can stay in the code for production runs. A phase that
+# stops inside another one is nested under it: its share is of the parent's
+# time, and only top-level phases share the total.
+
+BUCKETS = 40  # Histogram bucket b holds durations in [2**(b-1), 2**b) ns; the last one everything longer
+
+def _zero():
+    return 0
+
+def _discard(*args):
+    pass
+
+class PhaseStats:
+    __slots__ = ('calls', 'total_ns', 'max_ns', 'histogram')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = [0] * BUCKETS
+
+    def percentile(self, q):
+        # Upper bound (ns) of the bucket holding the q-th quantile
+        target = q * self.calls
+        seen = 0
+        for bucket, n in enumerate(self.histogram):
+            seen += n
+            if n and seen >= target:
+                return 2 ** bucket
+        return 0
+
+    def summary(self):
+        return {
+            'calls': self.calls,
+            'total_ms': self.total_ns / 1e6,
+            'mean_us': self.total_ns / self.calls / 1e3 if self.calls else 0.0,
+            'p50_us': self.percentile(0.5) / 1e3,
+            'p99_us': self.percentile(0.99) / 1e3,
+            'max_us': self.max_ns / 1e3,
+        }
+
+class Profiler:
+    def __init__(self, enabled=False, report_every=None, report=print):
+        self.phases = {}
+        self.counters = {}
+        self.parents = {}  # Nested phase -> the phase it ran inside
+        self.open = []  # Per running phase, the names of the phases that stopped inside it
+        self.ticks = 0
+        self.report_every = report_every  # Ticks between summaries, None for none
+        self.report = report
+        self.set_enabled(enabled)
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        if enabled:
+            self.start = self._start
+            self.stop = self._stop
+            self.count = self._count
+            self.tick = self._tick
+        else:
+            self.start = _zero
+            self.stop = self.count = self.tick = _discard
+
+    def _start(self):
+        self.open.append(set())
+        return time.perf_counter_ns()
+
+    def _stop(self, phase, started):
+        elapsed = time.perf_counter_ns() - started
+        if self.open:
+            for child in self.open.pop():
+                self.parents[child] = phase
+        if self.open:
+            self.open[-1].add(phase)
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats()
+        stats.calls += 1
+        stats.total_ns += elapsed
+        if elapsed > stats.max_ns:
+            stats.max_ns = elapsed
+        stats.histogram[min(elapsed.bit_length(), BUCKETS - 1)] += 1
+
+    def _count(self, counter, n=1):
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def _tick(self):
+        # Called once per loop iteration; prints a summary every report_every ticks
+        self.ticks += 1
+        if self.report_every and self.ticks % self.report_every == 0:
+            self.report(self.format())
+
+    def reset(self):
+        self.phases.clear()
+        self.counters.clear()
+        self.parents.clear()
+        self.open.clear()
+        self.ticks = 0
+
+    def tree(self, parent=None):
+        # Phases in report order: by total time, each followed by its nested ones
+        children = [name for name in self.phases if self.parents.get(name) == parent]
+        for name in sorted(children, key=lambda name: -self.phases[name].total_ns):
+            yield name
+            yield from self.tree(name)
+
+    def summary(self):
+        # share: of the parent's time for nested phases, of the top-level total otherwise
+        total = sum(stats.total_ns for name, stats in self.phases.items() if name not in self.parents) or 1
+        phases = {}
+        for name in self.tree():
+            stats = self.phases[name]
+            parent = self.parents.get(name)
+            phases[name] = stats.summary()
+            phases[name]['parent'] = parent
+            base = self.phases[parent].total_ns if parent else total
+            phases[name]['share'] = stats.total_ns / (base or 1)
+        return {'ticks': self.ticks, 'phases': phases, 'counters': dict(self.counters)}
+
+    def format(self):
+        summary = self.summary()
+        lines = [f"{summary['ticks']} ticks"]
+        for name, s in summary['phases'].items():
+            depth, parent = 0, s['parent']
+            while parent is not None:
+                depth, parent = depth + 1, summary['phases'][parent]['parent']
+            label = '  ' * depth + name
+            lines.append(f"  {label:<24} {s['calls']:>9} calls {s['mean_us']:>9.1f} us avg "
+                         f"{s['p99_us']:>9.1f} us p99 {s['share']:>6.1%}")
+        for name, n in sorted(summary['counters'].items()):
+            lines.append(f"  {name:<24} {n:>9}")
+        return '\n'.join(lines)
+
+    def dump(self, path):
+        # Summary plus raw histograms as JSON
+        data = self.summary()
+        data['buckets_ns'] = [2 ** b for b in range(BUCKETS)]
+        data['histograms'] = {name: stats.histogram for name, stats in self.phases.items()}
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=1)
+
+profiler = Profiler()
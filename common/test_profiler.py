@@ -0,0 +1,23 @@
+from common.profiler import Profiler
+
+def test_nested_phases_share_their_parent():
+    profiler = Profiler(enabled=True)
+    for _ in range(3):
+        outer = profiler.start()
+        inner = profiler.start()
+        profiler.stop('inner', inner)
+        profiler.stop('outer', outer)
+        other = profiler.start()
+        profiler.stop('other', other)
+    summary = profiler.summary()['phases']
+    assert list(summary) in (['outer', 'inner', 'other'], ['other', 'outer', 'inner'])
+    assert summary['inner']['parent'] == 'outer'
+    assert summary['outer']['parent'] is None
+    assert abs(summary['outer']['share'] + summary['other']['share'] - 1) < 1e-9
+    assert 0 <= summary['inner']['share'] <= 1
+    assert profiler.format().count('\n    inner') == 1
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    profiler.stop('phase', profiler.start())
+    assert profiler.summary()['phases'] == {}
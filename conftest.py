@@ -0,0 +1,22 @@
+import os
+import sys
+
+# 10161 and 10171 are separate programs with modules of the same names
+# (config, cat, replay, main). Before a test file there is imported, put
+# its own directory first and drop the other one's copies of those names.
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PROGRAMS = [os.path.join(ROOT, name) for name in ('10161', '10171')]
+
+def pytest_collectstart(collector):
+    here = os.path.dirname(str(collector.path))
+    if here not in PROGRAMS:
+        return
+    if sys.path[0] != here:
+        if here in sys.path:
+            sys.path.remove(here)
+        sys.path.insert(0, here)
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, '__file__', None)
+        if path and os.path.dirname(os.path.abspath(path)) in PROGRAMS and \
+                os.path.dirname(os.path.abspath(path)) != here and os.path.exists(os.path.join(here, name + '.py')):
+            del sys.modules[name]